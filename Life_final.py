@@ -1,68 +1,260 @@
 import pandas as pd
-from openai import OpenAI
+import numpy as np
 from datetime import datetime, timedelta
 import os
-import plotly.express as px
-import plotly.graph_objects as go
-import google_fit
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from log_store import LOG_SCHEMAS, open_store
+from timestamps import format_timestamps, now_timestamp, to_timestamp
+from log_index import FinanceAggregates, FoodDigest
+from nutrition import load_food_db
+from bank_import import import_statement, load_rules, summarize
+from llm_cache import LLMCache, make_key
 
 # 🔐 Groq API Setup
 GROQ_API_KEY = ""
 GROQ_MODEL = "llama3-70b-8192"
-client = OpenAI(
-    api_key=GROQ_API_KEY,
-    base_url="https://api.groq.com/openai/v1"
-)
+SYSTEM_PROMPT = "You are a helpful wellness and finance assistant."
 
-def call_groq_api(prompt, max_tokens=800):
+# 💤 Nothing below touches the network, the disk or heavy libraries at import time:
+# clients, the response cache and the logs are created on first use and then
+# reused for the life of the process (so across Streamlit reruns too)
+client = None
+llm_cache = None
+
+def get_client():
+    global client
+    if client is None:
+        from openai import OpenAI
+        client = OpenAI(api_key=GROQ_API_KEY, base_url="https://api.groq.com/openai/v1")
+    return client
+
+# 🧠 LLM response cache (set LIFESYNC_LLM_CACHE_TTL=0 to keep entries until evicted)
+def get_llm_cache():
+    global llm_cache
+    if llm_cache is None:
+        llm_cache = LLMCache(
+            path=os.environ.get("LIFESYNC_LLM_CACHE_FILE", "llm_cache.db"),
+            ttl=int(os.environ.get("LIFESYNC_LLM_CACHE_TTL", 6 * 3600)),
+            max_entries=int(os.environ.get("LIFESYNC_LLM_CACHE_SIZE", 500))
+        )
+    return llm_cache
+
+def build_messages(prompt):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+def call_groq_api(prompt, max_tokens=800, temperature=0.7, use_cache=True, stream=False, json_mode=False):
+    if stream:
+        return stream_groq_api(prompt, max_tokens, temperature, use_cache)
+    messages = build_messages(prompt)
+    options = {"response_format": {"type": "json_object"}} if json_mode else {}
+    key = make_key(GROQ_MODEL, messages, temperature, max_tokens, **options)
+    if use_cache:
+        cached = get_llm_cache().get(key)
+        if cached is not None:
+            return cached
     try:
-        response = client.chat.completions.create(
+        response = get_client().chat.completions.create(
             model=GROQ_MODEL,
-            messages=[
-                {"role": "system", "content": "You are a helpful wellness and finance assistant."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **options
+        )
+        content = response.choices[0].message.content
+        if use_cache and content:
+            get_llm_cache().set(key, content)
+        return content
+    except Exception as e:
+        return f"❌ API error: {e}"
+
+def stream_groq_api(prompt, max_tokens=800, temperature=0.7, use_cache=True):
+    # Yields text chunks as they arrive; a cache hit is yielded as one chunk
+    messages = build_messages(prompt)
+    key = make_key(GROQ_MODEL, messages, temperature, max_tokens)
+    if use_cache:
+        cached = get_llm_cache().get(key)
+        if cached is not None:
+            yield cached
+            return
+    parts = []
+    try:
+        response = get_client().chat.completions.create(
+            model=GROQ_MODEL,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        for chunk in response:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                parts.append(text)
+                yield text
+    except Exception as e:
+        yield f"❌ API error: {e}"
+        return
+    if use_cache and parts:
+        get_llm_cache().set(key, "".join(parts))
+
+# ⚡ Async LLM path: one background event loop shared by every session, so the
+# async client's connection pool is reused and independent prompts run in parallel
+async_client = None
+llm_loop = None
+llm_loop_lock = threading.Lock()
+
+def get_async_client():
+    global async_client
+    if async_client is None:
+        from openai import AsyncOpenAI
+        async_client = AsyncOpenAI(api_key=GROQ_API_KEY, base_url="https://api.groq.com/openai/v1")
+    return async_client
+
+def get_llm_loop():
+    global llm_loop
+    with llm_loop_lock:
+        if llm_loop is None:
+            llm_loop = asyncio.new_event_loop()
+            threading.Thread(target=llm_loop.run_forever, name="llm-loop", daemon=True).start()
+    return llm_loop
+
+async def async_call_groq_api(prompt, max_tokens=800, temperature=0.7, use_cache=True):
+    # The cache is SQLite on disk: its reads and writes run off the event loop
+    messages = build_messages(prompt)
+    key = make_key(GROQ_MODEL, messages, temperature, max_tokens)
+    if use_cache:
+        cached = await asyncio.to_thread(get_llm_cache().get, key)
+        if cached is not None:
+            return cached
+    try:
+        response = await get_async_client().chat.completions.create(
+            model=GROQ_MODEL,
+            messages=messages,
+            temperature=temperature,
             max_tokens=max_tokens
         )
-        return response.choices[0].message.content
+        content = response.choices[0].message.content
+        if use_cache and content:
+            await asyncio.to_thread(get_llm_cache().set, key, content)
+        return content
     except Exception as e:
         return f"❌ API error: {e}"
 
+async def gather_prompts(requests, max_concurrency=4):
+    semaphore = asyncio.Semaphore(max_concurrency)
+    async def run(request):
+        async with semaphore:
+            return await async_call_groq_api(**request)
+    return await asyncio.gather(*(run(request) for request in requests))
+
+def gather_groq_api(requests, max_concurrency=4):
+    # requests: prompt strings or dicts of async_call_groq_api kwargs; answers keep their order
+    requests = [{"prompt": r} if isinstance(r, str) else r for r in requests]
+    return asyncio.run_coroutine_threadsafe(gather_prompts(requests, max_concurrency), get_llm_loop()).result()
+
+def submit_groq_api(prompt, **kwargs):
+    # Returns a concurrent.futures.Future; call .result() when the answer is needed
+    return asyncio.run_coroutine_threadsafe(async_call_groq_api(prompt, **kwargs), get_llm_loop())
+
+def llm_cache_stats():
+    return get_llm_cache().stats()
+
+# 🗂️ Log Storage (csv, sqlite or parquet)
+STORE_BACKEND = os.environ.get("LIFESYNC_STORE", "csv")
+stores = {}
+stores_lock = threading.Lock()
+
+def get_store(name):
+    # Opened on first use; finance and food are loaded right away to fill their views
+    with stores_lock:
+        if name not in stores:
+            store = open_store(name, STORE_BACKEND)
+            if name == "finance":
+                store.stats = store.add_listener(FinanceAggregates())
+                store.load()
+            elif name == "food":
+                store.digest = store.add_listener(FoodDigest())
+                store.load()
+            elif name in SAMPLE_LOGS and not store.exists():
+                store.append(SAMPLE_LOGS[name])
+            stores[name] = store
+        return stores[name]
+
+def fresh_store(name):
+    # The store caught up with other processes' writes, for readers of its views
+    store = get_store(name)
+    store.refresh()
+    return store
+
+# The logs, stores and views used to be module globals filled at import time;
+# they are now resolved on access, so `from Life_final import df_finance` still works
+LAZY_NAMES = {
+    "finance_store": lambda: get_store("finance"),
+    "food_store": lambda: get_store("food"),
+    "sleep_store": lambda: get_store("sleep"),
+    "exercise_store": lambda: get_store("exercise"),
+    "finance_stats": lambda: fresh_store("finance").stats,
+    "food_digest": lambda: fresh_store("food").digest,
+    "df_finance": lambda: get_store("finance").frame(),
+    "food_log": lambda: get_store("food").frame(),
+    "sleep_log": lambda: get_store("sleep").frame(),
+    "exercise_log": lambda: get_store("exercise").frame(),
+    "food_db": lambda: get_food_db()
+}
+
+def __getattr__(name):
+    if name in LAZY_NAMES:
+        return LAZY_NAMES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def data_version(*names):
+    # Change counters of the given logs (all by default), for keying memoised views
+    return tuple(fresh_store(name).version for name in names or LOG_SCHEMAS)
+
 # 📊 Finance Tracker
-finance_file = "finance_log.csv"
-if os.path.exists(finance_file):
-    df_finance = pd.read_csv(finance_file)
-    df_finance["date"] = pd.to_datetime(df_finance["date"], format="mixed", errors="coerce")
-else:
-    df_finance = pd.DataFrame(columns=["date", "type", "amount", "category", "note"])
 
 def add_transaction(t_type, amount, category, note=""):
-    global df_finance
+    finance_store = get_store("finance")
     try:
         amount = float(amount)
         if t_type.lower() not in ["income", "expense"]:
             return "⚠️ Type must be 'income' or 'expense'."
-        new_entry = pd.DataFrame([{
-            "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
+        finance_store.append({
+            "date": now_timestamp(),
             "type": t_type.lower(),
             "amount": amount,
             "category": category.lower(),
             "note": note
-        }])
-        df_finance = pd.concat([df_finance, new_entry], ignore_index=True)
-        df_finance.to_csv(finance_file, index=False)
+        })
         return f"✅ Added: {t_type.upper()} ₹{amount} for '{category}' - {note}"
     except ValueError:
         return "⚠️ Invalid amount. Please enter a number."
 
+def import_bank_statement(source, name=None, rules_path=None):
+    # Bank export (CSV, OFX or QIF) -> finance log, streamed in chunks and deduped
+    # against what is already logged; rules default to LIFESYNC_BANK_RULES
+    finance_store = get_store("finance")
+    try:
+        rules = load_rules(rules_path or os.environ.get("LIFESYNC_BANK_RULES"))
+        report = import_statement(source, finance_store, rules, name=name)
+    except (OSError, ValueError) as e:
+        return f"⚠️ Could not import statement: {e}"
+    return summarize(report)
+
 def show_finance_summary():
-    income = df_finance[df_finance["type"] == "income"]["amount"].sum()
-    expense = df_finance[df_finance["type"] == "expense"]["amount"].sum()
-    balance = income - expense
-    expense_breakdown = df_finance[df_finance["type"] == "expense"].groupby("category")["amount"].sum()
+    finance_stats = fresh_store("finance").stats
+    income = finance_stats.income
+    expense = finance_stats.expense
+    balance = finance_stats.balance
+    expense_breakdown = finance_stats.category_totals("expense")
     # Format expense breakdown as a markdown list for clean UI display
-    breakdown_formatted = "\n".join([f"- **{cat.capitalize()}**: ₹{amt:.2f}" for cat, amt in expense_breakdown.items()]) if not expense_breakdown.empty else "No expenses recorded."
+    breakdown_formatted = "\n".join([f"- **{cat.capitalize()}**: ₹{amt:.2f}" for cat, amt in expense_breakdown.items()]) if expense_breakdown else "No expenses recorded."
     return {
         "income": income,
         "expense": expense,
@@ -70,14 +262,14 @@ def show_finance_summary():
         "expense_breakdown": breakdown_formatted
     }
 
-def generate_finance_advice():
-    income = df_finance[df_finance["type"] == "income"]["amount"].sum()
-    expenses_df = df_finance[df_finance["type"] == "expense"]
-    expenses = expenses_df.groupby("category")["amount"].sum().to_dict()
+def finance_advice_prompt():
+    finance_stats = fresh_store("finance").stats
+    income = finance_stats.income
+    expenses = finance_stats.category_totals("expense")
     total_expense = sum(expenses.values())
     balance = income - total_expense
     if income == 0 or not expenses:
-        return "⚠️ Add some finance data before getting advice."
+        return None
     breakdown = "\n".join([f"- {cat}: ₹{amt:.0f}" for cat, amt in expenses.items()])
     prompt = f"""You are a smart, helpful personal finance advisor.
 
@@ -88,61 +280,167 @@ Total expenses: ₹{total_expense}
 Available balance: ₹{balance}
 
 Based on this, give practical savings advice for next month. Focus on reducing food, entertainment, subscriptions, etc. Recommend a monthly savings goal. Be natural, helpful, and realistic."""
-    return call_groq_api(prompt)
+    return prompt
+
+def generate_finance_advice(stream=False, bundled=False):
+    return run_advice("finance", stream, bundled)
 
 # 🍽️ Food Tracker
-food_db = {
-    "roti": {"cal": 120, "cat": "carb"}, "rice": {"cal": 130, "cat": "carb"},
-    "dal": {"cal": 100, "cat": "protein"}, "chicken curry": {"cal": 180, "cat": "protein"},
-    "egg": {"cal": 78, "cat": "protein"}, "banana": {"cal": 90, "cat": "carb"},
-    "apple": {"cal": 52, "cat": "fiber"}, "milk": {"cal": 103, "cat": "protein"},
-    "bread": {"cal": 66, "cat": "carb"}, "butter": {"cal": 102, "cat": "fat"},
-    "maggi": {"cal": 205, "cat": "junk"}, "pizza slice": {"cal": 285, "cat": "junk"},
-    "burger": {"cal": 295, "cat": "junk"}, "chips": {"cal": 150, "cat": "junk"},
-    "coffee": {"cal": 40, "cat": "fat"}, "tea": {"cal": 30, "cat": "fat"},
-    "salad": {"cal": 60, "cat": "fiber"}, "paneer": {"cal": 265, "cat": "protein"},
-    "oats": {"cal": 68, "cat": "carb"}, "spinach": {"cal": 30, "cat": "fiber"},
-    "green beans": {"cal": 40, "cat": "fiber"}, "curd": {"cal": 60, "cat": "protein"}
-}
+food_db_cache = None
+food_db_lock = threading.Lock()
+
+def get_food_db():
+    # Built-in foods plus the LIFESYNC_FOOD_DB catalogue, loaded on first use
+    global food_db_cache
+    with food_db_lock:
+        if food_db_cache is None:
+            food_db_cache = load_food_db()
+        return food_db_cache
+
+def search_foods(query, limit=10):
+    # Search-as-you-type: exact, prefix and typo-tolerant matches -> [(name, score)]
+    return get_food_db().search(query, limit)
+
+# Prompt context for food: this many recent days in detail, older days rolled up
+FOOD_PROMPT_DAYS = int(os.environ.get("LIFESYNC_FOOD_PROMPT_DAYS", 7))
+FOOD_PROMPT_TOKENS = int(os.environ.get("LIFESYNC_FOOD_PROMPT_TOKENS", 600))
 
-food_file = "food_log.csv"
-if os.path.exists(food_file):
-    food_log = pd.read_csv(food_file)
-    food_log["datetime"] = pd.to_datetime(food_log["datetime"], format="mixed", errors="coerce")
-else:
-    food_log = pd.DataFrame(columns=["datetime", "meal", "item", "quantity", "calories", "category"])
+def food_prompt_context():
+    food_digest = fresh_store("food").digest
+    return food_digest.context(FOOD_PROMPT_DAYS, FOOD_PROMPT_TOKENS)
+
+# Servings per logged row; also keeps quantity within the food log's Int16 column
+MAX_MEAL_QUANTITY = 1000
 
 def log_meal(meal_type, item, qty):
-    global food_log
+    food_store = get_store("food")
     try:
         qty = int(qty)
-        item = item.lower()
-        if item not in food_db:
-            return f"⚠️ '{item}' not in food database."
+        if not 0 < qty <= MAX_MEAL_QUANTITY:
+            return f"⚠️ Quantity must be between 1 and {MAX_MEAL_QUANTITY}."
+        food_db = get_food_db()
+        typed = " ".join(str(item).lower().split())
+        item = food_db.match(typed)
+        if item is None:
+            suggestions = [name for name, _ in food_db.search(typed, limit=3)] if typed else []
+            hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+            return f"⚠️ '{typed}' not in food database.{hint}"
         cal = food_db[item]["cal"] * qty
         cat = food_db[item]["cat"]
-        new_row = pd.DataFrame([{
-            "datetime": datetime.now().strftime("%Y-%m-%d %H:%M"),
+        food_store.append({
+            "datetime": now_timestamp(),
             "meal": meal_type.lower(),
             "item": item,
             "quantity": qty,
             "calories": cal,
             "category": cat
-        }])
-        food_log = pd.concat([food_log, new_row], ignore_index=True)
-        food_log.to_csv(food_file, index=False)
-        return f"✅ {qty}x {item} logged for {meal_type} ({cal} kcal, {cat})"
+        })
+        corrected = f" (matched '{typed}')" if item != typed else ""
+        return f"✅ {qty}x {item} logged for {meal_type} ({cal:g} kcal, {cat}){corrected}"
     except ValueError:
         return "⚠️ Invalid quantity. Please enter a number."
 
+# Column names accepted from meal imports, mapped onto the food log
+MEAL_ALIASES = {"date": "datetime", "time": "datetime", "timestamp": "datetime", "meal_type": "meal",
+                "food": "item", "name": "item", "qty": "quantity", "servings": "quantity"}
+
+def log_meals(rows, meal_type=None):
+    # Bulk log_meal: validates a whole batch, joins it against the food database
+    # once per distinct item and appends every valid row in one write.
+    # rows: list of dicts or a DataFrame with item, quantity, meal and optionally
+    # datetime (defaults to now); meal_type fills in rows without a meal.
+    batch = rows.copy() if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+    batch = batch.rename(columns=lambda c: MEAL_ALIASES.get(str(c).strip().lower(), str(c).strip().lower()))
+    if batch.columns.duplicated().any():
+        # e.g. rows mixing "qty" and "quantity": keep the first value given
+        batch = batch.T.groupby(level=0, sort=False).first().T
+    if batch.empty or "item" not in batch.columns:
+        return "⚠️ No meals to log: expected at least an 'item' column."
+    food_db = get_food_db()
+    index = batch.index
+
+    # Items: one fuzzy match per distinct name, then calories/category by code
+    typed = batch["item"].astype("string").str.lower().str.split().str.join(" ").fillna("")
+    codes, names = pd.factorize(typed)
+    matched = [food_db.match(name) if name else None for name in names]
+    item = pd.Series(np.array(matched, dtype=object)[codes], index=index)
+    cal = np.array([food_db[m]["cal"] if m else np.nan for m in matched], dtype=float)[codes]
+    cat = np.array([food_db[m]["cat"] if m else None for m in matched], dtype=object)[codes]
+
+    if "quantity" in batch.columns:
+        qty = pd.to_numeric(batch["quantity"], errors="coerce")
+    else:
+        qty = pd.Series(1, index=index)
+    meal = batch["meal"].astype("string").str.strip().str.lower() if "meal" in batch.columns else pd.Series(pd.NA, index=index, dtype="string")
+    if meal_type:
+        meal = meal.replace("", pd.NA).fillna(meal_type.strip().lower())
+    if "datetime" in batch.columns:
+        stamps = format_timestamps(batch["datetime"])
+        stamps = stamps.where(stamps.notna() | batch["datetime"].notna(), now_timestamp())
+    else:
+        stamps = pd.Series(now_timestamp(), index=index, dtype=object)
+
+    problems = {
+        "unknown item": item.isna(),
+        "invalid quantity": ~((qty > 0) & (qty <= MAX_MEAL_QUANTITY) & (qty % 1 == 0)).fillna(False),
+        "missing meal": meal.fillna("").eq(""),
+        "invalid date": stamps.isna()
+    }
+    invalid = np.logical_or.reduce([mask.to_numpy(dtype=bool) for mask in problems.values()])
+    valid = ~invalid
+
+    quantity = qty[valid].astype(int)
+    logged = pd.DataFrame({
+        "datetime": stamps[valid],
+        "meal": meal[valid].astype(object),
+        "item": item[valid],
+        "quantity": quantity,
+        "calories": cal[valid] * quantity.to_numpy(),
+        "category": cat[valid]
+    })
+    if not logged.empty:
+        get_store("food").append(logged.to_dict("records"))
+
+    message = f"✅ {len(logged)} meal item(s) logged ({logged['calories'].sum():,.0f} kcal)"
+    corrected = int((item[valid] != typed[valid]).sum())
+    if corrected:
+        message += f", {corrected} matched to the closest food name"
+    if invalid.any():
+        reasons = []
+        for reason, mask in problems.items():
+            rows_hit = [str(i + 1) for i in np.flatnonzero(mask.to_numpy(dtype=bool))[:5]]
+            if rows_hit:
+                more = "…" if mask.sum() > 5 else ""
+                reasons.append(f"{reason} (rows {', '.join(rows_hit)}{more})")
+        message += f". ⚠️ Skipped {int(invalid.sum())}: " + "; ".join(reasons)
+    return message
+
+def read_meal_file(source, name=None):
+    # CSV or JSON (a list of objects) from a path or an uploaded file
+    name = name or getattr(source, "name", None) or str(source)
+    if name.lower().endswith(".json"):
+        if isinstance(source, str):
+            with open(source, encoding="utf-8") as f:
+                return pd.DataFrame(json.load(f))
+        return pd.DataFrame(json.load(source))
+    return pd.read_csv(source, dtype=str, keep_default_na=False, na_values=[""])
+
+def import_meals(source, meal_type=None, name=None):
+    # Backfill weeks of meals from an exported CSV/JSON file in one batch
+    try:
+        meals = read_meal_file(source, name)
+    except (OSError, ValueError) as e:
+        return f"⚠️ Could not read meal file: {e}"
+    return log_meals(meals, meal_type)
+
 def show_food_summary(limit=2200, data=None):
     if data is None:
-        data = food_log
+        data = get_store("food").frame()
     if data.empty:
         return {"error": "⚠️ No food data to display."}
     total = data["calories"].sum()
-    per_meal = data.groupby("meal")["calories"].sum()
-    cat_counts = data["category"].value_counts()
+    per_meal = data.groupby("meal", observed=True)["calories"].sum()
+    cat_counts = data["category"].value_counts()[lambda counts: counts > 0]
     junk_warning = "🚨 Too much junk food logged today." if cat_counts.get("junk", 0) > 2 else ""
     # Format calories by meal and category counts as markdown lists for clean UI display
     meal_formatted = "\n".join([f"- **{meal.capitalize()}**: {cal:.0f} kcal" for meal, cal in per_meal.items()]) if not per_meal.empty else "No meals recorded."
@@ -156,29 +454,32 @@ def show_food_summary(limit=2200, data=None):
         "junk_warning": junk_warning
     }
 
-def diet_advice_agent():
-    if food_log.empty:
-        return "⚠️ No meals logged."
-    total = food_log["calories"].sum()
-    meals = food_log.groupby("meal")["calories"].sum().to_dict()
-    categories = food_log["category"].value_counts().to_dict()
-    meal_txt = "\n".join([f"- {k}: {v:.0f} kcal" for k, v in meals.items()])
-    cat_txt = ", ".join([f"{k}={v}" for k, v in categories.items()])
-    meal_list = "\n".join([f"- {row['datetime']}: {row['meal']} - {row['quantity']}x {row['item']} ({row['calories']} kcal, {row['category']})" for _, row in food_log.iterrows()])
+def diet_advice_prompt():
+    food_digest = fresh_store("food").digest
+    day = food_digest.latest_day()
+    if day is None:
+        return None
+    latest = food_digest.days[day]
+    meal_txt = "\n".join([f"- {k}: {v:.0f} kcal" for k, v in sorted(latest["meals"].items())])
+    cat_txt = ", ".join([f"{k}={v}" for k, v in sorted(latest["categories"].items())])
     prompt = f"""You are a health-conscious AI nutrition coach.
 
-Today's intake:
-Total calories: {total}
+Latest day's intake ({day}):
+Total calories: {latest["calories"]:.0f}
 Meal calories:
 {meal_txt}
 Nutrition distribution: {cat_txt}
-Meals consumed:
-{meal_list}
+Daily history (newest first):
+{food_prompt_context()}
 
 Based on the specific meals consumed, total calories, and nutrition distribution, assess if the user is eating too little, too much, or has an imbalance in macros (fiber, protein, etc.). Warn about junk food and suggest specific improvements for tomorrow's diet, referencing the consumed meals where relevant. Be practical and friendly."""
-    return call_groq_api(prompt)
+    return prompt
+
+def diet_advice_agent(stream=False, bundled=False):
+    return run_advice("diet", stream, bundled)
 
-def smart_meal_suggester(ingredients, calorie_target=500, reuse_mode=True):
+def smart_meal_suggester(ingredients, calorie_target=500, reuse_mode=True, stream=False):
+    exercise_log = get_store("exercise").frame()
     ingredient_line = ", ".join(ingredients)
     reuse_clause = "Prefer reusing these ingredients to reduce waste, but you can add others as needed." if reuse_mode else "Feel free to use any ingredients."
     exercise_cals = exercise_log["est_calories"].tail(7).sum() if not exercise_log.empty else 0
@@ -186,28 +487,24 @@ def smart_meal_suggester(ingredients, calorie_target=500, reuse_mode=True):
     prompt = f"""You are a nutrition coach. I have these ingredients: {ingredient_line}.
 Suggest eight diverse meals from various global cuisines (e.g., Italian, Mexican, Japanese, Mediterranean, etc.) around {calorie_target} kcal each. {reuse_clause}
 Mention missing macros (fiber, protein, etc) if any, and suggest what to add. Give 2–3 line steps per meal. Output should be natural, easy to follow, and include the cuisine type for each meal."""
-    return call_groq_api(prompt, max_tokens=2000)
+    return call_groq_api(prompt, max_tokens=2000, stream=stream)
 
-def answer_food_question(question):
+def answer_food_question(question, stream=False):
+    food_digest = fresh_store("food").digest
     ingredient_line = ", ".join(["rice", "chicken", "spinach", "beans"])
     food_context = ""
-    if not food_log.empty:
-        total = food_log["calories"].sum()
-        meal_list = "\n".join([f"- {row['datetime']}: {row['meal']} - {row['quantity']}x {row['item']} ({row['calories']} kcal, {row['category']})" for _, row in food_log.iterrows()])
-        food_context = f"User's recent food log:\nTotal calories: {total} kcal\nMeals consumed:\n{meal_list}\n"
+    if food_digest.days:
+        food_context = f"User's recent food log (daily summaries, newest first):\n{food_prompt_context()}\n"
     question_prompt = f"""You are a nutrition coach specializing in meals, food, diet, and health. {food_context}User's available ingredients: {ingredient_line}.
 Answer the following question only if it is related to meals, food, diet, or health: '{question}'.
 If the question is unrelated to these topics, respond with: 'This model is built only for answering food, diet, and health-related questions, nothing else.'
 Provide a detailed, practical, and friendly response."""
-    return call_groq_api(question_prompt, max_tokens=1000)
+    return call_groq_api(question_prompt, max_tokens=1000, stream=stream)
 
 # 😴 Sleep & 🏋️ Exercise Tracker
-sleep_file = "sleep_log.csv"
-if os.path.exists(sleep_file):
-    sleep_log = pd.read_csv(sleep_file)
-else:
-    sleep_log = pd.DataFrame(columns=["date", "sleep_time", "wake_time", "screen_before_bed", "wake_fresh", "hours", "mood"])
-    sample_sleep = pd.DataFrame([
+# Sample rows written the first time the sleep / exercise logs are opened
+SAMPLE_LOGS = {
+    "sleep": [
         {"date": "2025-07-06", "sleep_time": "22:00", "wake_time": "06:00", "screen_before_bed": 30, "wake_fresh": "yes", "hours": 8.0, "mood": "happy"},
         {"date": "2025-07-07", "sleep_time": "23:00", "wake_time": "05:30", "screen_before_bed": 60, "wake_fresh": "no", "hours": 6.5, "mood": "tired"},
         {"date": "2025-07-08", "sleep_time": "22:30", "wake_time": "06:30", "screen_before_bed": 45, "wake_fresh": "yes", "hours": 8.0, "mood": "relaxed"},
@@ -215,29 +512,20 @@ else:
         {"date": "2025-07-10", "sleep_time": "22:00", "wake_time": "07:00", "screen_before_bed": 20, "wake_fresh": "yes", "hours": 9.0, "mood": "energetic"},
         {"date": "2025-07-11", "sleep_time": "22:45", "wake_time": "06:15", "screen_before_bed": 30, "wake_fresh": "yes", "hours": 7.5, "mood": "calm"},
         {"date": "2025-07-12", "sleep_time": "23:00", "wake_time": "06:30", "screen_before_bed": 40, "wake_fresh": "no", "hours": 7.5, "mood": "neutral"}
-    ])
-    sleep_log = pd.concat([sleep_log, sample_sleep], ignore_index=True)
-    sleep_log.to_csv(sleep_file, index=False)
-
-exercise_file = "exercise_log.csv"
-if os.path.exists(exercise_file):
-    exercise_log = pd.read_csv(exercise_file)
-else:
-    exercise_log = pd.DataFrame(columns=["date", "type", "duration", "intensity", "est_calories", "heart_rate", "steps", "notes"])
-    sample_exercise = pd.DataFrame([
+    ],
+    "exercise": [
         {"date": "2025-07-06", "type": "running", "duration": 30, "intensity": "moderate", "est_calories": 180, "heart_rate": 140, "steps": 5000, "notes": "Felt great!"},
         {"date": "2025-07-07", "type": "yoga", "duration": 45, "intensity": "low", "est_calories": 180, "heart_rate": 90, "steps": 2000, "notes": "Stretching day"},
         {"date": "2025-07-09", "type": "cycling", "duration": 60, "intensity": "high", "est_calories": 540, "heart_rate": 160, "steps": 3000, "notes": "Tough ride"},
         {"date": "2025-07-10", "type": "weightlifting", "duration": 40, "intensity": "high", "est_calories": 360, "heart_rate": 150, "steps": 1500, "notes": "Leg day"},
         {"date": "2025-07-11", "type": "walking", "duration": 20, "intensity": "low", "est_calories": 80, "heart_rate": 100, "steps": 3000, "notes": "Evening stroll"}
-    ])
-    exercise_log = pd.concat([exercise_log, sample_exercise], ignore_index=True)
-    exercise_log.to_csv(exercise_file, index=False)
+    ]
+}
 
 def log_sleep(sleep_time_str, wake_time_str, screen_minutes, woke_fresh=True, mood="neutral"):
-    global sleep_log
+    sleep_store = get_store("sleep")
     try:
-        date = datetime.now().strftime("%Y-%m-%d")
+        date = to_timestamp(datetime.now().date())
         fmt = "%H:%M"
         sleep_time = datetime.strptime(sleep_time_str, fmt)
         wake_time = datetime.strptime(wake_time_str, fmt)
@@ -245,7 +533,7 @@ def log_sleep(sleep_time_str, wake_time_str, screen_minutes, woke_fresh=True, mo
         if wake_time <= sleep_time:
             wake_time += timedelta(days=1)
         hours = round((wake_time - sleep_time).total_seconds() / 3600, 2)
-        entry = pd.DataFrame([{
+        sleep_store.append({
             "date": date,
             "sleep_time": sleep_time_str,
             "wake_time": wake_time_str,
@@ -253,16 +541,13 @@ def log_sleep(sleep_time_str, wake_time_str, screen_minutes, woke_fresh=True, mo
             "wake_fresh": "yes" if woke_fresh else "no",
             "hours": hours,
             "mood": mood.lower()
-        }])
-        if not entry.dropna(axis=1, how="all").empty:
-            sleep_log = pd.concat([sleep_log, entry], ignore_index=True)
-            sleep_log.to_csv(sleep_file, index=False)
+        })
         return f"🎉 Sleep logged: {hours} hrs, Mood: {mood}!"
     except ValueError:
         return "⚠️ Invalid input. Ensure time format is HH:MM and screen minutes is a number."
 
 def log_exercise(activity_type, duration_minutes, intensity_level, heart_rate=0, steps=0, notes=""):
-    global exercise_log
+    exercise_store = get_store("exercise")
     try:
         duration_minutes = float(duration_minutes)
         heart_rate = int(heart_rate) if heart_rate else 0
@@ -270,10 +555,10 @@ def log_exercise(activity_type, duration_minutes, intensity_level, heart_rate=0,
         intensity_level = intensity_level.lower()
         if intensity_level not in ["low", "moderate", "high"]:
             return "⚠️ Intensity must be 'low', 'moderate', or 'high'."
-        date = datetime.now().strftime("%Y-%m-%d")
+        date = to_timestamp(datetime.now().date())
         cal_map = {"low": 4, "moderate": 6, "high": 9}
         est_cals = duration_minutes * cal_map.get(intensity_level, 5)
-        entry = pd.DataFrame([{
+        exercise_store.append({
             "date": date,
             "type": activity_type.lower(),
             "duration": duration_minutes,
@@ -282,11 +567,9 @@ def log_exercise(activity_type, duration_minutes, intensity_level, heart_rate=0,
             "heart_rate": heart_rate,
             "steps": steps,
             "notes": notes
-        }])
-        if not entry.dropna(axis=1, how="all").empty:
-            exercise_log = pd.concat([exercise_log, entry], ignore_index=True)
-            exercise_log.to_csv(exercise_file, index=False)
-        progress = exercise_log["duration"].tail(7).sum()
+        })
+        exercise_log = exercise_store.frame()
+        progress = float(exercise_log["duration"].tail(7).sum())
         goal = 150
         return {
             "message": f"💪 Exercise logged: {duration_minutes} min {activity_type}, {est_cals} kcal, HR: {heart_rate} bpm!",
@@ -296,34 +579,75 @@ def log_exercise(activity_type, duration_minutes, intensity_level, heart_rate=0,
     except ValueError:
         return "⚠️ Invalid input. Ensure numbers are valid."
 
-def log_fit_exercise():
-    service = google_fit.init_fit_service()
-    fit_data = google_fit.get_fit_sessions(service)
-    if fit_data.empty:
-        return {"success": False, "message": "⚠️ No Google Fit data found.", "data": None}
+def prepare_fit_data(fit_data):
     fit_data.loc[fit_data["type"].str.lower().isin(["rem sleep", "light sleep", "deep sleep", "sleeping"]), "steps"] = 0
     fit_data.loc[fit_data["type"].str.lower().isin(["rem sleep", "light sleep", "deep sleep", "sleeping"]), "distance_m"] = 0
     fit_data.loc[fit_data["type"].str.lower().isin(["rem sleep", "light sleep", "deep sleep", "sleeping"]), "calories"] = fit_data["duration_minutes"] * 1
-    fit_data["date"] = pd.to_datetime(fit_data["date"], format="mixed", errors="coerce").dt.date
+    fit_data["date"] = format_timestamps(fit_data["date"])
     fit_data["duration_minutes"] = pd.to_numeric(fit_data["duration_minutes"], errors="coerce").fillna(0).astype(float)
-    success = google_fit.log_fit_to_exercise(exercise_file, fit_data)
+    return fit_data
+
+def log_fit_exercise(backfill_days=None, max_chunks=None):
+    import google_fit
+    exercise_store = get_store("exercise")
+    service = google_fit.init_fit_service()
+    report = google_fit.FetchReport()
+    logged = []
+    def log_chunk(chunk):
+        # Syncs overlap the previous one, so only report the sessions that are new
+        chunk = prepare_fit_data(chunk)
+        chunk = chunk[google_fit.fit_key_index(exercise_store).is_new(chunk["date"], chunk["type"])]
+        if google_fit.log_fit_to_exercise(exercise_store, chunk):
+            logged.append(chunk)
+    if backfill_days:
+        google_fit.backfill_fit_sessions(service, log_chunk, days=backfill_days, max_chunks=max_chunks, report=report)
+    else:
+        google_fit.sync_fit_sessions(service, log_chunk, max_chunks=max_chunks, report=report)
+    fit_data = pd.concat(logged, ignore_index=True) if logged else pd.DataFrame()
+    failed = "" if report.ok else f" ⚠️ {len(report.failures)} Google Fit requests failed ({report.summary()}); the affected range is retried on the next sync."
+    if fit_data.empty:
+        message = "⚠️ No new Google Fit sessions since the last sync." if report.ok else failed.strip()
+        return {"success": False, "message": message, "data": None, "failures": report.failures}
     return {
-        "success": success,
-        "message": "✅ Google Fit data synced to exercise log!" if success else "⚠️ No new data to sync.",
-        "data": fit_data[["date", "type", "name", "duration_minutes", "steps", "distance_m", "calories"]]
+        "success": True,
+        "message": "✅ Google Fit data synced to exercise log!" + failed,
+        "data": fit_data[["date", "type", "name", "duration_minutes", "steps", "distance_m", "calories"]],
+        "failures": report.failures
     }
 
-def show_wellness_summary():
+def wellness_motivation_prompt(sleep_log, exercise_log):
+    avg_hours = sleep_log["hours"].tail(7).mean() if not sleep_log.empty else 0
+    total_mins = exercise_log["duration"].tail(7).sum() if not exercise_log.empty else 0
+    return f"""You're a motivational wellness coach. Based on:
+- Avg sleep: {avg_hours:.1f} hrs
+- Total exercise mins: {total_mins} min
+Give a short, upbeat message to inspire the user for tomorrow!"""
+
+def submit_wellness_motivation():
+    # Future on the shared LLM loop, through the LLM cache: start it first, read it last.
+    # Failed calls aren't cached, so they are retried on the next view. None without data
+    sleep_log = get_store("sleep").frame()
+    exercise_log = get_store("exercise").frame()
+    if sleep_log.empty and exercise_log.empty:
+        return None
+    return submit_groq_api(wellness_motivation_prompt(sleep_log, exercise_log))
+
+def show_wellness_summary(motivation=True):
+    import plotly.express as px
+    sleep_log = get_store("sleep").frame()
+    exercise_log = get_store("exercise").frame()
     if sleep_log.empty and exercise_log.empty:
         return {"error": "⚠️ No sleep or exercise data yet."}
     
     result = {"sleep": {}, "exercise": {}, "motivation": ""}
+    # Start the motivation call first so it runs while the stats and chart are built
+    pending = submit_groq_api(wellness_motivation_prompt(sleep_log, exercise_log)) if motivation else None
     
     if not sleep_log.empty:
         recent = sleep_log.tail(7)
         avg_hours = recent["hours"].mean()
         sleep_debt = max(0, 7 * 8 - recent["hours"].sum())
-        mood_counts = recent["mood"].value_counts()
+        mood_counts = recent["mood"].value_counts()[lambda counts: counts > 0]
         sleep_rating = "🌟 Awesome" if avg_hours >= 7.5 else "⚠️ Boost Needed" if avg_hours < 6 else "✅ Good"
         screen_warning = f"💤 High screen time ({recent['screen_before_bed'].mean():.0f} min avg) might affect sleep." if recent["screen_before_bed"].mean() > 60 else ""
         result["sleep"] = {
@@ -336,7 +660,6 @@ def show_wellness_summary():
     
     if not exercise_log.empty:
         recent_ex = exercise_log.tail(7)
-        recent_ex["date"] = pd.to_datetime(recent_ex["date"])
         total_mins = recent_ex["duration"].sum()
         total_cals = recent_ex["est_calories"].sum()
         high_days = recent_ex[recent_ex["intensity"] == "high"].shape[0]
@@ -360,19 +683,16 @@ def show_wellness_summary():
             "scatter_fig": fig
         }
     
-    avg_hours = result["sleep"].get("avg_hours", 0)
-    total_mins = result["exercise"].get("total_mins", 0)
-    msg = call_groq_api(f"""You're a motivational wellness coach. Based on:
-- Avg sleep: {avg_hours:.1f} hrs
-- Total exercise mins: {total_mins} min
-Give a short, upbeat message to inspire the user for tomorrow!""")
-    result["motivation"] = msg.strip()
+    if pending is not None:
+        result["motivation"] = pending.result().strip()
     
     return result
 
-def recovery_ai_agent():
+def recovery_prompt():
+    sleep_log = get_store("sleep").frame()
+    exercise_log = get_store("exercise").frame()
     if sleep_log.empty and exercise_log.empty:
-        return "⚠️ No sleep or exercise data yet."
+        return None
     s = sleep_log.tail(3)
     e = exercise_log.tail(5)
     avg_sleep = s["hours"].mean() if not s.empty else 0
@@ -397,9 +717,14 @@ Give advice for:
 5. Suggest one small improvement they can do from tomorrow.
 
 Be smart but friendly."""
-    return call_groq_api(prompt)
+    return prompt
+
+def recovery_ai_agent(stream=False, bundled=False):
+    return run_advice("recovery", stream, bundled)
 
-def weekly_goal_recommender():
+def weekly_goal_prompt():
+    sleep_log = get_store("sleep").frame()
+    exercise_log = get_store("exercise").frame()
     avg_sleep = sleep_log["hours"].tail(7).mean() if not sleep_log.empty else 0
     total_ex = exercise_log["duration"].tail(7).sum() if not exercise_log.empty else 0
     prompt = f"""You're a smart AI health planner. Based on the data:
@@ -413,9 +738,12 @@ Recommend:
 3. What to maintain and what to improve.
 
 Keep it short and specific."""
-    return call_groq_api(prompt)
+    return prompt
+
+def weekly_goal_recommender(stream=False, bundled=False):
+    return run_advice("goals", stream, bundled)
 
-def recovery_schedule():
+def recovery_schedule(stream=False):
     prompt = """I'm feeling a bit low on energy and overtrained.
 
 Design a simple 3-day wellness recovery plan. Include:
@@ -423,12 +751,14 @@ Design a simple 3-day wellness recovery plan. Include:
 - Low-stress exercise or rest
 - One helpful tip per day
 Make it short and personalized."""
-    return call_groq_api(prompt)
+    return call_groq_api(prompt, stream=stream)
 
-def budget_food_analysis():
-    food_expenses = df_finance[(df_finance["type"] == "expense") & (df_finance["category"] == "food")]["amount"].sum()
-    total_expense = df_finance[df_finance["type"] == "expense"]["amount"].sum()
-    income = df_finance[df_finance["type"] == "income"]["amount"].sum()
+def budget_food_analysis(stream=False):
+    finance_stats = fresh_store("finance").stats
+    food_log = get_store("food").frame()
+    food_expenses = finance_stats.category_totals("expense").get("food", 0)
+    total_expense = finance_stats.expense
+    income = finance_stats.income
     food_calories = food_log["calories"].sum() if not food_log.empty else 0
     prompt = f"""You're a frugal nutrition coach.
 
@@ -438,14 +768,18 @@ def budget_food_analysis():
 - Total calories consumed: {food_calories:.0f} kcal
 
 Analyze if food spending is proportional to income and calorie needs. Suggest 2-3 cost-effective, healthy meal ideas using ingredients from the food database. Keep it practical."""
-    return call_groq_api(prompt)
+    return call_groq_api(prompt, stream=stream)
 
-def holistic_wellness_report():
+def holistic_prompt():
+    finance_stats = fresh_store("finance").stats
+    food_log = get_store("food").frame()
+    sleep_log = get_store("sleep").frame()
+    exercise_log = get_store("exercise").frame()
     avg_sleep = sleep_log["hours"].tail(7).mean() if not sleep_log.empty else 0
     total_ex_cals = exercise_log["est_calories"].tail(7).sum() if not exercise_log.empty else 0
     food_calories = food_log["calories"].tail(7).sum() if not food_log.empty else 0
     junk_count = food_log[food_log["category"] == "junk"].shape[0] if not food_log.empty else 0
-    balance = df_finance[df_finance["type"] == "income"]["amount"].sum() - df_finance[df_finance["type"] == "expense"]["amount"].sum()
+    balance = finance_stats.balance
     prompt = f"""You're a holistic wellness coach.
 
 - Avg sleep (last 7 days): {avg_sleep:.1f} hrs
@@ -455,28 +789,219 @@ def holistic_wellness_report():
 - Financial balance: ₹{balance:.2f}
 
 Provide a concise report on overall wellness, linking sleep, exercise, diet, and finance. Suggest one key action to improve balance across all areas."""
-    return call_groq_api(prompt)
+    return prompt
+
+def holistic_wellness_report(stream=False, bundled=False):
+    return run_advice("holistic", stream, bundled)
+
+# 🤖 Advice agents: prompt builder (returns None without data), data check used
+# instead of the prompt in bundled mode (None: always has data), warning shown instead
+def has_finance_advice_data():
+    finance_stats = fresh_store("finance").stats
+    return finance_stats.income != 0 and bool(finance_stats.category_totals("expense"))
+
+def has_diet_advice_data():
+    return fresh_store("food").digest.latest_day() is not None
+
+def has_recovery_data():
+    return not (get_store("sleep").frame().empty and get_store("exercise").frame().empty)
+
+ADVICE_AGENTS = {
+    "finance": (finance_advice_prompt, has_finance_advice_data, "⚠️ Add some finance data before getting advice."),
+    "diet": (diet_advice_prompt, has_diet_advice_data, "⚠️ No meals logged."),
+    "recovery": (recovery_prompt, has_recovery_data, "⚠️ No sleep or exercise data yet."),
+    "goals": (weekly_goal_prompt, None, None),
+    "holistic": (holistic_prompt, None, None)
+}
+
+def run_advice(name, stream=False, bundled=False):
+    if bundled:
+        return run_bundled_advice([name])[name]
+    build_prompt, has_data, warning = ADVICE_AGENTS[name]
+    prompt = build_prompt()
+    if prompt is None:
+        return warning
+    return call_groq_api(prompt, stream=stream)
+
+def run_bundled_advice(names):
+    results, ready = {}, []
+    for name in names:
+        build_prompt, has_data, warning = ADVICE_AGENTS[name]
+        if has_data is None or has_data():
+            ready.append(name)
+        else:
+            results[name] = warning
+    if ready:
+        results.update(bundled_reports(names=ready))
+    return {name: results[name] for name in names}
+
+def run_advice_agents(names, max_concurrency=4):
+    results, ready = {}, {}
+    for name in names:
+        build_prompt, has_data, warning = ADVICE_AGENTS[name]
+        prompt = build_prompt()
+        if prompt is None:
+            results[name] = warning
+        else:
+            ready[name] = prompt
+    results.update(zip(ready, gather_groq_api(list(ready.values()), max_concurrency)))
+    return {name: results[name] for name in names}
+
+def daily_digest(max_concurrency=4, bundled=False):
+    names = ["finance", "diet", "recovery", "goals"]
+    if bundled:
+        # One bundle for the whole digest, handed out by section
+        return run_bundled_advice(names)
+    return run_advice_agents(names, max_concurrency)
+
+# 📦 Bundled report mode: one request with the shared stats, answered as a JSON
+# object with one section per agent, validated before it is cached or used
+REPORT_SECTIONS = {
+    "finance": "Practical savings advice for next month (food, entertainment, subscriptions) and a realistic monthly savings goal.",
+    "diet": "Whether the user eats too little, too much or has a macro imbalance, junk food warnings, and specific improvements for tomorrow's diet.",
+    "recovery": "Advice on energy levels, sleep hygiene, whether they need more rest or more workouts, how screen time links to poor wake-ups, and one small improvement from tomorrow.",
+    "goals": "One smart sleep goal and one fitness activity goal for next week, plus what to maintain and what to improve. Short and specific.",
+    "holistic": "A concise overall wellness report linking sleep, exercise, diet and finance, with one key action to improve balance."
+}
+REPORT_SCHEMA = {
+    "type": "object",
+    "required": list(REPORT_SECTIONS),
+    "properties": {name: {"type": "string", "minLength": 1} for name in REPORT_SECTIONS}
+}
+
+def shared_context():
+    finance_stats = fresh_store("finance").stats
+    food_digest = fresh_store("food").digest
+    sleep_log = get_store("sleep").frame()
+    exercise_log = get_store("exercise").frame()
+    expenses = finance_stats.category_totals("expense")
+    lines = [
+        "Finance:",
+        f"- Income: ₹{finance_stats.income:.0f}, expenses: ₹{finance_stats.expense:.0f}, balance: ₹{finance_stats.balance:.0f}",
+        "- Expenses by category: " + (", ".join(f"{cat}=₹{amt:.0f}" for cat, amt in expenses.items()) or "none")
+    ]
+    if food_digest.days:
+        lines += ["Food (daily summaries, newest first):", food_prompt_context()]
+    else:
+        lines += ["Food:", "- No meals logged."]
+    if not sleep_log.empty:
+        s = sleep_log.tail(7)
+        lines += [
+            "Sleep (last 7 entries):",
+            f"- Avg sleep: {s['hours'].mean():.1f} hrs, screen before bed avg: {s['screen_before_bed'].mean():.0f} mins",
+            f"- Wake freshness: {s['wake_fresh'].tolist()}, moods: {s['mood'].tolist()}"
+        ]
+    else:
+        lines += ["Sleep:", "- No sleep logged."]
+    if not exercise_log.empty:
+        e = exercise_log.tail(7)
+        lines += [
+            "Exercise (last 7 entries):",
+            f"- Total minutes: {e['duration'].sum():.0f}, calories burned: {e['est_calories'].sum():.0f} kcal, intense workouts: {(e['intensity'] == 'high').sum()}"
+        ]
+    else:
+        lines += ["Exercise:", "- No exercise logged."]
+    return "\n".join(lines)
+
+def bundled_report_prompt(sections):
+    tasks = "\n".join(f'- "{name}": {REPORT_SECTIONS[name]}' for name in sections)
+    return f"""You are a team of personal coaches (finance, nutrition, recovery, planning and holistic wellness) sharing one view of the user's data.
+
+{shared_context()}
+
+Write one section per coach:
+{tasks}
+
+Respond with only a JSON object whose keys are exactly {json.dumps(list(sections))} and whose values are friendly, practical markdown strings."""
+
+def validate_report(report, schema=REPORT_SCHEMA, sections=None):
+    if not isinstance(report, dict):
+        return False
+    for name in sections or schema["required"]:
+        value = report.get(name)
+        if not isinstance(value, str) or len(value.strip()) < schema["properties"][name]["minLength"]:
+            return False
+    return True
+
+def parse_bundled_report(raw, sections):
+    text = (raw or "").strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    try:
+        report = json.loads(text)
+    except ValueError:
+        return None
+    return {name: report[name].strip() for name in sections} if validate_report(report, sections=sections) else None
+
+# Bundle keys whose answer arrived but failed validation: their data gets the
+# individual agents right away for a while. API errors are not recorded, so a
+# network blip doesn't turn bundling off. Oldest entries go past the cap.
+BUNDLE_RETRY_SECONDS = 30 * 60
+MAX_FAILED_BUNDLES = 128
+failed_bundles = OrderedDict()
+failed_bundles_lock = threading.Lock()
+
+def bundle_failed_recently(key):
+    with failed_bundles_lock:
+        failed_at = failed_bundles.get(key)
+        if failed_at is not None and time.monotonic() - failed_at > BUNDLE_RETRY_SECONDS:
+            del failed_bundles[key]
+            failed_at = None
+        return failed_at is not None
+
+def record_failed_bundle(key):
+    with failed_bundles_lock:
+        failed_bundles[key] = time.monotonic()
+        failed_bundles.move_to_end(key)
+        while len(failed_bundles) > MAX_FAILED_BUNDLES:
+            failed_bundles.popitem(last=False)
+
+def bundled_reports(sections=tuple(REPORT_SECTIONS), names=None, max_tokens=2500, temperature=0.7):
+    # Asks for every section (so all views share one cached bundle) and returns the named ones
+    sections = list(sections)
+    names = list(names or sections)
+    prompt = bundled_report_prompt(sections)
+    key = make_key(GROQ_MODEL, build_messages(prompt), temperature, max_tokens, response_format={"type": "json_object"})
+    cached = get_llm_cache().get(key)
+    if cached is not None:
+        report = json.loads(cached)
+        return {name: report[name] for name in names}
+    if not bundle_failed_recently(key):
+        raw = call_groq_api(prompt, max_tokens, temperature, use_cache=False, json_mode=True)
+        report = parse_bundled_report(raw, sections)
+        if report is not None:
+            get_llm_cache().set(key, json.dumps(report, ensure_ascii=False))
+            return {name: report[name] for name in names}
+        if raw and not raw.startswith("❌ API error"):
+            record_failed_bundle(key)
+    # Invalid or failed bundle: only the requested agents, in parallel; their answers
+    # go through the LLM cache, so a repeat view doesn't ask again
+    return run_advice_agents(names)
 
 def visualize_finance():
+    import plotly.express as px
+    import plotly.graph_objects as go
+    finance_stats = fresh_store("finance").stats
+    df_finance = get_store("finance").frame()
     if df_finance.empty:
         return {"error": "⚠️ No finance data to visualize."}
-    df_finance["date"] = pd.to_datetime(df_finance["date"])
-    income = df_finance[df_finance["type"] == "income"]["amount"].sum()
-    expense = df_finance[df_finance["type"] == "expense"]["amount"].sum()
+    income = finance_stats.income
+    expense = finance_stats.expense
     bar_fig = go.Figure(data=[
         go.Bar(name="Income", x=["Income"], y=[income], marker_color="green"),
         go.Bar(name="Expense", x=["Expense"], y=[expense], marker_color="red")
     ])
     bar_fig.update_layout(title="Money Spent vs. Earned", yaxis_title="Amount (₹)", barmode="group")
-    expenses = df_finance[df_finance["type"] == "expense"].groupby("category")["amount"].sum()
-    pie_fig = px.pie(values=expenses.values, names=expenses.index, title="Expense Category Split") if not expenses.empty else None
+    expenses = finance_stats.category_totals("expense")
+    pie_fig = px.pie(values=list(expenses.values()), names=list(expenses.keys()), title="Expense Category Split") if expenses else None
     return {"bar_fig": bar_fig, "pie_fig": pie_fig}
 
 def visualize_food():
+    import plotly.express as px
+    food_log = get_store("food").frame()
     if food_log.empty:
         return {"error": "⚠️ No food data to visualize."}
-    food_log["datetime"] = pd.to_datetime(food_log["datetime"])
-    calories_by_meal = food_log.groupby("meal")["calories"].sum()
+    calories_by_meal = food_log.groupby("meal", observed=True)["calories"].sum()
     if not calories_by_meal.empty:
         fig = px.bar(x=calories_by_meal.index, y=calories_by_meal.values, title="Calorie Intake by Meal Type",
                      labels={"x": "Meal Type", "y": "Calories (kcal)"}, color_discrete_sequence=["skyblue"])
@@ -484,9 +1009,10 @@ def visualize_food():
     return {"error": "⚠️ No meal data to visualize."}
 
 def visualize_sleep():
+    import plotly.express as px
+    sleep_log = get_store("sleep").frame()
     if sleep_log.empty:
         return {"error": "⚠️ No sleep data to visualize."}
-    sleep_log["date"] = pd.to_datetime(sleep_log["date"])
     sleep_by_date = sleep_log.groupby("date")["hours"].mean()
     if not sleep_by_date.empty:
         fig = px.line(x=sleep_by_date.index, y=sleep_by_date.values, title="Sleep Duration Over Time",
@@ -495,10 +1021,11 @@ def visualize_sleep():
     return {"error": "⚠️ No sleep data to visualize."}
 
 def visualize_exercise():
+    import plotly.express as px
+    exercise_log = get_store("exercise").frame()
     if exercise_log.empty:
         return {"error": "⚠️ No exercise data to visualize."}
-    exercise_log["date"] = pd.to_datetime(exercise_log["date"], format="mixed", errors="coerce").dt.date
-    duration_by_type = exercise_log.groupby("type")["duration"].sum()
+    duration_by_type = exercise_log.groupby("type", observed=True)["duration"].sum()
     if not duration_by_type.empty:
         fig = px.bar(x=duration_by_type.index, y=duration_by_type.values, title="Exercise Duration by Type",
                      labels={"x": "Exercise Type", "y": "Minutes"}, color_discrete_sequence=["purple"])
@@ -506,35 +1033,47 @@ def visualize_exercise():
     return {"error": "⚠️ No exercise data to visualize."}
 
 def reset_all_data():
-    global df_finance, food_log, sleep_log, exercise_log
-    df_finance = pd.DataFrame(columns=["date", "type", "amount", "category", "note"])
-    food_log = pd.DataFrame(columns=["datetime", "meal", "item", "quantity", "calories", "category"])
-    sleep_log = pd.DataFrame(columns=["date", "sleep_time", "wake_time", "screen_before_bed", "wake_fresh", "hours", "mood"])
-    exercise_log = pd.DataFrame(columns=["date", "type", "duration", "intensity", "est_calories", "heart_rate", "steps", "notes"])
-    for file in [finance_file, food_file, sleep_file, exercise_file]:
-        if os.path.exists(file):
-            os.remove(file)
+    for name in LOG_SCHEMAS:
+        get_store(name).reset()
     return "✅ All data reset successfully."
 
+def compact_logs():
+    rows = {name: get_store(name).compact() for name in LOG_SCHEMAS}
+    return f"✅ Compacted {sum(rows.values())} rows across {len(rows)} logs."
+
+def food_for_day(selected_date):
+    return get_store("food").query(selected_date, selected_date + timedelta(days=1))
+
 def show_daily_breakdown(selected_date):
-    date_str = selected_date.strftime("%Y-%m-%d")
-    food_day = food_log[pd.to_datetime(food_log["datetime"]).dt.date == selected_date] if not food_log.empty else pd.DataFrame()
-    ex_day = exercise_log[exercise_log["date"] == date_str] if not exercise_log.empty else pd.DataFrame()
-    finance_day = df_finance[pd.to_datetime(df_finance["date"]).dt.date == selected_date] if not df_finance.empty else pd.DataFrame()
+    finance_store = get_store("finance")
+    exercise_store = get_store("exercise")
+    next_date = selected_date + timedelta(days=1)
+    food_day = food_for_day(selected_date)
+    ex_day = exercise_store.query(selected_date, next_date)
+    finance_day = finance_store.query(selected_date, next_date)
     summary = {
         "food_calories": food_day["calories"].sum() if not food_day.empty else 0,
         "exercise_minutes": ex_day["duration"].sum() if not ex_day.empty else 0,
         "finance_expense": finance_day[finance_day["type"] == "expense"]["amount"].sum() if not finance_day.empty else 0
     }
-    all_data = []
-    if not food_day.empty:
-        for _, row in food_day.iterrows():
-            all_data.append(["Food", row["datetime"], row["meal"], f"{row['quantity']}x {row['item']}", f"{row['calories']} kcal", row["category"]])
-    if not ex_day.empty:
-        for _, row in ex_day.iterrows():
-            all_data.append(["Exercise", row["date"], row["type"], f"{row['duration']} min", f"{row['est_calories']} kcal", row["intensity"]])
-    if not finance_day.empty:
-        for _, row in finance_day.iterrows():
-            all_data.append(["Finance", row["date"], row["type"], f"₹{row['amount']}", row["category"], row["note"]])
-    df_daily = pd.DataFrame(all_data, columns=["Type", "Time", "Activity", "Details", "Value", "Category/Note"])
+    daily_columns = ["Type", "Time", "Activity", "Details", "Value", "Category/Note"]
+    parts = [
+        pd.DataFrame({
+            "Type": "Food", "Time": food_day["datetime"], "Activity": food_day["meal"],
+            "Details": food_day["quantity"].astype(str) + "x " + food_day["item"].astype(str),
+            "Value": food_day["calories"].astype(str) + " kcal", "Category/Note": food_day["category"]
+        }),
+        pd.DataFrame({
+            "Type": "Exercise", "Time": ex_day["date"], "Activity": ex_day["type"],
+            "Details": ex_day["duration"].astype(str) + " min",
+            "Value": ex_day["est_calories"].astype(str) + " kcal", "Category/Note": ex_day["intensity"]
+        }),
+        pd.DataFrame({
+            "Type": "Finance", "Time": finance_day["date"], "Activity": finance_day["type"],
+            "Details": "₹" + finance_day["amount"].astype(str),
+            "Value": finance_day["category"], "Category/Note": finance_day["note"]
+        })
+    ]
+    parts = [part for part in parts if not part.empty]
+    df_daily = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=daily_columns)
     return {"summary": summary, "table": df_daily}
\ No newline at end of file
@@ -4,14 +4,14 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 from Life_final import (
-    add_transaction, show_finance_summary, generate_finance_advice,
-    log_meal, show_food_summary, diet_advice_agent, smart_meal_suggester, answer_food_question,
-    log_sleep, log_exercise, log_fit_exercise, show_wellness_summary,
+    add_transaction, import_bank_statement, show_finance_summary, generate_finance_advice,
+    log_meal, log_meals, import_meals, show_food_summary, diet_advice_agent, smart_meal_suggester, answer_food_question,
+    log_sleep, log_exercise, log_fit_exercise, show_wellness_summary, submit_wellness_motivation,
     recovery_ai_agent, weekly_goal_recommender, recovery_schedule,
     budget_food_analysis, holistic_wellness_report,
     visualize_finance, visualize_food, visualize_sleep, visualize_exercise,
-    reset_all_data, df_finance, food_log, sleep_log, exercise_log, food_db,
-    show_daily_breakdown
+    reset_all_data, get_food_db, search_foods, get_store, fresh_store, data_version,
+    show_daily_breakdown, food_for_day, llm_cache_stats, daily_digest
 )
 
 # Streamlit page configuration
@@ -212,14 +212,92 @@ st.markdown("""
     </script>
 """, unsafe_allow_html=True)
 
+def show_advice(result):
+    # Advice functions return a plain string for warnings and a chunk generator when streaming
+    if isinstance(result, str):
+        st.markdown(result, unsafe_allow_html=True)
+    else:
+        st.write_stream(result)
+
+# ♻️ Memoised views, keyed on the version counters of the logs they read: a rerun
+# that didn't change any data gets the last result back instead of recomputing it
+@st.cache_data(show_spinner=False)
+def quick_stats(versions):
+    finance_stats = fresh_store("finance").stats
+    food_log = get_store("food").frame()
+    sleep_log = get_store("sleep").frame()
+    exercise_log = get_store("exercise").frame()
+    return {
+        "income": finance_stats.income,
+        "expense": finance_stats.expense,
+        "balance": finance_stats.balance,
+        "total_calories": float(food_log["calories"].sum()) if not food_log.empty else 0,
+        "meals_logged": food_log.shape[0],
+        "avg_sleep": float(sleep_log["hours"].mean()) if not sleep_log.empty else 0,
+        "total_ex_mins": float(exercise_log["duration"].sum()) if not exercise_log.empty else 0
+    }
+
+@st.cache_data(show_spinner=False)
+def balance_radar(versions):
+    stats = quick_stats(versions)
+    categories = ["Finance", "Nutrition", "Sleep", "Exercise"]
+    values = [
+        max(stats["balance"] / 50000, 0.1),
+        max(stats["total_calories"] / 2200, 0.1),
+        max(stats["avg_sleep"] / 8.0, 0.1),
+        max(stats["total_ex_mins"] / 150, 0.1)
+    ]
+    fig = go.Figure(data=[
+        go.Scatter3d(
+            x=[1, 2, 3, 4, 1],
+            y=[0, 0, 0, 0, 0],
+            z=values + [values[0]],
+            mode='lines+markers',
+            line=dict(color='#4ecdc4', width=5),
+            marker=dict(size=10, color='#ff6b6b', symbol='circle')
+        )
+    ])
+    fig.update_layout(
+        scene=dict(
+            xaxis=dict(title='', ticktext=categories, tickvals=[1, 2, 3, 4], showgrid=False, color='#e6e6ff'),
+            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            zaxis=dict(title='Score', range=[0, 1], showgrid=False, color='#e6e6ff'),
+            bgcolor='rgba(0,0,0,0)'
+        ),
+        title=dict(text="Your Life Balance (3D View)", font=dict(color='#ffffff', size=20)),
+        margin=dict(t=50, b=50, l=50, r=50),
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#e6e6ff'),
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+VISUALIZERS = {
+    "Finance": ("finance", visualize_finance),
+    "Food": ("food", visualize_food),
+    "Sleep": ("sleep", visualize_sleep),
+    "Exercise": ("exercise", visualize_exercise)
+}
+
+@st.cache_data(show_spinner=False)
+def cached_visualization(viz_type, versions):
+    return VISUALIZERS[viz_type][1]()
+
+@st.cache_data(show_spinner=False)
+def cached_wellness_summary(versions):
+    # Stats and chart only: the motivation is fetched per view through the LLM cache
+    return show_wellness_summary(motivation=False)
+
 def show_homepage():
     st.markdown('<div class="header">🌟 LifeSync: Wellness & Finance</div>', unsafe_allow_html=True)
     st.markdown('<p style="text-align: center; font-size: 1.2em; color: #e6e6ff;">Empower your life with balance and style.</p>', unsafe_allow_html=True)
 
     col1, col2, col3 = st.columns(3, gap="large")
-    income = df_finance[df_finance["type"] == "income"]["amount"].sum()
-    expense = df_finance[df_finance["type"] == "expense"]["amount"].sum()
-    balance = income - expense
+    versions = data_version()
+    stats = quick_stats(versions)
+    income = stats["income"]
+    expense = stats["expense"]
+    balance = stats["balance"]
     with col1:
         st.markdown("""
             <div class="card">
@@ -233,7 +311,7 @@ def show_homepage():
             st.session_state.option = "Add Transaction"
             st.rerun()
 
-    total_calories = food_log["calories"].sum() if not food_log.empty else 0
+    total_calories = stats["total_calories"]
     calorie_goal = 2200
     with col2:
         st.markdown("""
@@ -242,14 +320,14 @@ def show_homepage():
                 <p class="metric"><span class="metric-label">Calories:</span> {} kcal</p>
                 <p class="metric"><span class="metric-label">Meals Logged:</span> {}</p>
             </div>
-        """.format(total_calories, food_log.shape[0] if not food_log.empty else 0), unsafe_allow_html=True)
+        """.format(total_calories, stats["meals_logged"]), unsafe_allow_html=True)
         st.progress(min(total_calories / calorie_goal, 1.0))
         if st.button("🍴 Log a Meal", key="quick_meal"):
             st.session_state.option = "Log Meal"
             st.rerun()
 
-    avg_sleep = sleep_log["hours"].mean() if not sleep_log.empty else 0
-    total_ex_mins = exercise_log["duration"].sum() if not exercise_log.empty else 0
+    avg_sleep = stats["avg_sleep"]
+    total_ex_mins = stats["total_ex_mins"]
     with col3:
         st.markdown("""
             <div class="card">
@@ -263,36 +341,7 @@ def show_homepage():
             st.session_state.option = "Log Sleep"
             st.rerun()
 
-    categories = ["Finance", "Nutrition", "Sleep", "Exercise"]
-    values = [
-        max(balance / 50000, 0.1),
-        max(total_calories / 2200, 0.1),
-        max(avg_sleep / 8.0, 0.1),
-        max(total_ex_mins / 150, 0.1)
-    ]
-    fig = go.Figure(data=[
-        go.Scatter3d(
-            x=[1, 2, 3, 4, 1],
-            y=[0, 0, 0, 0, 0],
-            z=values + [values[0]],
-            mode='lines+markers',
-            line=dict(color='#4ecdc4', width=5),
-            marker=dict(size=10, color='#ff6b6b', symbol='circle')
-        )
-    ])
-    fig.update_layout(
-        scene=dict(
-            xaxis=dict(title='', ticktext=categories, tickvals=[1, 2, 3, 4], showgrid=False, color='#e6e6ff'),
-            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-            zaxis=dict(title='Score', range=[0, 1], showgrid=False, color='#e6e6ff'),
-            bgcolor='rgba(0,0,0,0)'
-        ),
-        title=dict(text="Your Life Balance (3D View)", font=dict(color='#ffffff', size=20)),
-        margin=dict(t=50, b=50, l=50, r=50),
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='#e6e6ff'),
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
+    fig = balance_radar(versions)
     st.plotly_chart(fig, use_container_width=True)
 
 def display_daily_breakdown():
@@ -340,7 +389,7 @@ with st.sidebar:
             "Log Meal", "Show Food Summary", "Get Diet Advice", "Suggest Meals", "Ask Food Questions",
             "Log Sleep", "Log Exercise", "Sync Google Fit", "Show Wellness Summary",
             "Get Recovery Advice", "Weekly Goal Recommender", "Recovery Schedule",
-            "Budget vs. Food Analysis", "Holistic Wellness Report",
+            "Budget vs. Food Analysis", "Holistic Wellness Report", "Daily Digest",
             "Visualize Data", "Reset All Data", "Daily Breakdown"
         ],
         key="main_option",
@@ -348,11 +397,16 @@ with st.sidebar:
     )
     st.markdown("---")
     st.markdown('<h4 style="color: #4ecdc4;">Quick Stats</h4>', unsafe_allow_html=True)
-    balance = df_finance[df_finance["type"] == "income"]["amount"].sum() - df_finance[df_finance["type"] == "expense"]["amount"].sum()
+    stats = quick_stats(data_version())
+    balance = stats["balance"]
     st.markdown(f'<p class="metric"><span class="metric-label">💰 Balance:</span> ₹{balance:.2f} <span class="badge">{"+" if balance > 0 else "-"}</span></p>', unsafe_allow_html=True)
-    st.markdown(f'<p class="metric"><span class="metric-label">🍽️ Calories:</span> {food_log["calories"].sum() if not food_log.empty else 0} kcal <span class="badge">{"🔥" if food_log["calories"].sum() > 2200 else "✅"}</span></p>', unsafe_allow_html=True)
-    st.markdown(f'<p class="metric"><span class="metric-label">😴 Sleep:</span> {sleep_log["hours"].mean() if not sleep_log.empty else 0:.1f} hrs <span class="badge">{"🌙" if sleep_log["hours"].mean() >= 7 else "⚠️"}</span></p>', unsafe_allow_html=True)
-    st.markdown(f'<p class="metric"><span class="metric-label">🏋️‍♂️ Exercise:</span> {exercise_log["duration"].sum() if not exercise_log.empty else 0} min <span class="badge">{"💪" if exercise_log["duration"].sum() >= 150 else "⚠️"}</span></p>', unsafe_allow_html=True)
+    st.markdown(f'<p class="metric"><span class="metric-label">🍽️ Calories:</span> {stats["total_calories"]} kcal <span class="badge">{"🔥" if stats["total_calories"] > 2200 else "✅"}</span></p>', unsafe_allow_html=True)
+    st.markdown(f'<p class="metric"><span class="metric-label">😴 Sleep:</span> {stats["avg_sleep"]:.1f} hrs <span class="badge">{"🌙" if stats["avg_sleep"] >= 7 else "⚠️"}</span></p>', unsafe_allow_html=True)
+    st.markdown(f'<p class="metric"><span class="metric-label">🏋️‍♂️ Exercise:</span> {stats["total_ex_mins"]} min <span class="badge">{"💪" if stats["total_ex_mins"] >= 150 else "⚠️"}</span></p>', unsafe_allow_html=True)
+    bundled = st.toggle("📦 Bundle AI reports", value=False, key="bundled_reports",
+                        help="Fetch finance, diet, recovery, goal and holistic advice in one request")
+    cache_stats = llm_cache_stats()
+    st.caption(f"🧠 AI cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses ({cache_stats['entries']} saved)")
 
 # Main Content
 with st.container():
@@ -373,6 +427,13 @@ with st.container():
                 result = add_transaction(t_type, amount, category, note)
                 st.success(result)
                 st.markdown('<script>triggerConfetti();</script>', unsafe_allow_html=True)
+        with st.expander("🏦 Import a bank statement"):
+            st.caption("CSV, OFX or QIF exports. Transactions already in your log are skipped, so overlapping statements are safe to import.")
+            statement = st.file_uploader("Statement file", type=["csv", "ofx", "qfx", "qif"])
+            if statement is not None and st.button("Import Statement"):
+                with st.spinner("Importing transactions..."):
+                    result = import_bank_statement(statement, name=statement.name)
+                (st.warning if result.startswith("⚠️") else st.success)(result)
     elif option == "Show Finance Summary":
         st.markdown('<h3 style="color: #4ecdc4;">💰 Finance Overview</h3>', unsafe_allow_html=True)
         summary = show_finance_summary()
@@ -383,29 +444,58 @@ with st.container():
         st.markdown(summary["expense_breakdown"], unsafe_allow_html=True)
     elif option == "Get Finance Advice":
         st.markdown('<h3 style="color: #4ecdc4;">💡 Smart Money Tips</h3>', unsafe_allow_html=True)
-        advice = generate_finance_advice()
-        st.markdown(advice, unsafe_allow_html=True)
+        show_advice(generate_finance_advice(stream=True, bundled=bundled))
     elif option == "Log Meal":
         st.markdown('<h3 style="color: #4ecdc4;">🍽️ Log Your Meal</h3>', unsafe_allow_html=True)
+        # The search box lives outside the form so matches refresh as you type
+        query = st.text_input("Search Food", placeholder="e.g., paneer, chiken curry", help="Typos are fine")
+        matches = [name for name, _ in search_foods(query, limit=25)]
+        if query and not matches:
+            st.warning(f"No food matches '{query}'.")
         with st.form("meal_form"):
             col1, col2 = st.columns(2)
             with col1:
                 meal_type = st.text_input("Meal Type", placeholder="e.g., breakfast, lunch")
-                item = st.selectbox("Food Item", list(food_db.keys()), help="Pick your food")
+                item = st.selectbox("Food Item", matches or [name for name, _ in search_foods("", limit=25)], help="Best matches first")
             with col2:
                 qty = st.slider("Quantity", 1, 10, 1, help="How many servings?")
+                if item:
+                    info = get_food_db()[item]
+                    st.caption(f"Per {info['serving'] or 'serving'}: {info['cal']:g} kcal · {info['protein']:g} g protein · {info['carbs']:g} g carbs · {info['fat']:g} g fat · {info['fiber']:g} g fiber")
             submit = st.form_submit_button("Log Meal")
             if submit:
                 result = log_meal(meal_type, item, qty)
                 st.success(result)
                 st.markdown('<script>triggerConfetti();</script>', unsafe_allow_html=True)
+        st.markdown('<h4 style="color: #4ecdc4;">🧾 Log a Whole Meal</h4>', unsafe_allow_html=True)
+        with st.form("multi_meal_form"):
+            batch_meal = st.selectbox("Meal", ["breakfast", "lunch", "dinner", "snack"])
+            rows = st.data_editor(
+                pd.DataFrame({"item": pd.Series(dtype=str), "quantity": pd.Series(dtype=int)}),
+                num_rows="dynamic", use_container_width=True,
+                column_config={
+                    "item": st.column_config.TextColumn("Food Item", help="Typos are matched to the closest food", required=True),
+                    "quantity": st.column_config.NumberColumn("Quantity", min_value=1, max_value=10, step=1, default=1)
+                }
+            )
+            submit_batch = st.form_submit_button("Log All Items")
+            if submit_batch:
+                result = log_meals(rows.dropna(how="all"), batch_meal)
+                (st.success if result.startswith("✅") and "Skipped" not in result else st.warning)(result)
+        with st.expander("📥 Import meals from CSV/JSON"):
+            st.caption("Columns: datetime (or date), meal, item, quantity. Rows without a meal use the type chosen here; rows without a date are logged now.")
+            upload = st.file_uploader("Meal file", type=["csv", "json"])
+            import_meal = st.selectbox("Default meal", ["breakfast", "lunch", "dinner", "snack"], key="import_meal")
+            if upload is not None and st.button("Import Meals"):
+                result = import_meals(upload, import_meal, name=upload.name)
+                (st.success if result.startswith("✅") and "Skipped" not in result else st.warning)(result)
     elif option == "Show Food Summary":
         st.markdown('<h3 style="color: #4ecdc4;">🍽️ Nutrition Snapshot</h3>', unsafe_allow_html=True)
         selected_date = st.date_input("Select a Day", value=datetime.now().date(),
                                       min_value=datetime(2025, 7, 1), max_value=datetime.now().date(),
                                       help="View nutrition data for a specific day")
         limit = st.slider("Calorie Limit", 1000, 3000, 2200, step=100, help="Set your daily goal")
-        daily_food_log = food_log[pd.to_datetime(food_log["datetime"]).dt.date == selected_date] if not food_log.empty else pd.DataFrame()
+        daily_food_log = food_for_day(selected_date)
         summary = show_food_summary(limit) if daily_food_log.empty else show_food_summary(limit, daily_food_log)
         if "error" in summary:
             st.error(summary["error"])
@@ -421,8 +511,7 @@ with st.container():
                 st.warning(summary["junk_warning"])
     elif option == "Get Diet Advice":
         st.markdown('<h3 style="color: #4ecdc4;">🥗 Nutrition Coach</h3>', unsafe_allow_html=True)
-        advice = diet_advice_agent()
-        st.markdown(advice, unsafe_allow_html=True)
+        show_advice(diet_advice_agent(stream=True, bundled=bundled))
     elif option == "Suggest Meals":
         st.markdown('<h3 style="color: #4ecdc4;">🍴 Meal Ideas</h3>', unsafe_allow_html=True)
         with st.form("meal_suggest_form"):
@@ -434,9 +523,8 @@ with st.container():
                 if not ingredients.strip():
                     st.error("Please enter at least one ingredient.")
                 else:
-                    meal_output = smart_meal_suggester(ingredients.split(","), calorie_target, reuse)
                     st.markdown('<h3 style="color: #4ecdc4;">🤖 Meal Suggestions</h3>', unsafe_allow_html=True)
-                    st.markdown(meal_output, unsafe_allow_html=True)
+                    show_advice(smart_meal_suggester(ingredients.split(","), calorie_target, reuse, stream=True))
     elif option == "Ask Food Questions":
         st.markdown('<h3 style="color: #4ecdc4;">❓ Food & Diet Q&A</h3>', unsafe_allow_html=True)
         with st.form("food_question_form"):
@@ -446,9 +534,8 @@ with st.container():
                 if not question.strip():
                     st.error("Please enter a question.")
                 else:
-                    question_output = answer_food_question(question)
                     st.markdown('<h3 style="color: #4ecdc4;">🤖 Answers</h3>', unsafe_allow_html=True)
-                    st.markdown(question_output, unsafe_allow_html=True)
+                    show_advice(answer_food_question(question, stream=True))
     elif option == "Log Sleep":
         st.markdown('<h3 style="color: #4ecdc4;">😴 Log Your Sleep Vibes</h3>', unsafe_allow_html=True)
         with st.form("sleep_form"):
@@ -485,7 +572,14 @@ with st.container():
                 st.markdown('<script>triggerConfetti();</script>', unsafe_allow_html=True)
     elif option == "Sync Google Fit":
         st.markdown('<h3 style="color: #4ecdc4;">📱 Sync Google Fit</h3>', unsafe_allow_html=True)
+        with st.expander("⏪ Backfill older history"):
+            backfill_days = st.number_input("Days to backfill", min_value=1, max_value=365, value=30, step=1)
+            if st.button("Start Backfill"):
+                backfill = log_fit_exercise(backfill_days=backfill_days)
+                st.info(backfill["message"])
         result = log_fit_exercise()
+        if result["failures"] and result["data"] is not None:
+            st.warning(f"⚠️ {len(result['failures'])} Google Fit requests failed; those sessions will be fetched on the next sync.")
         if result["data"] is not None:
             st.markdown('<h3 style="color: #4ecdc4;">📱 Google Fit Data</h3>', unsafe_allow_html=True)
             st.dataframe(result["data"], use_container_width=True)
@@ -499,7 +593,8 @@ with st.container():
             st.warning(result["message"])
     elif option == "Show Wellness Summary":
         st.markdown('<h3 style="color: #4ecdc4;">🌟 Wellness Dashboard</h3>', unsafe_allow_html=True)
-        summary = show_wellness_summary()
+        motivation = submit_wellness_motivation()  # runs while the stats and chart render
+        summary = cached_wellness_summary(data_version("sleep", "exercise"))
         if "error" in summary:
             st.error(summary["error"])
         else:
@@ -523,32 +618,34 @@ with st.container():
                 st.markdown(summary["exercise"]["exercise_warning"], unsafe_allow_html=True)
             
             st.markdown('<h4 style="color: #4ecdc4;">🌟 Your Wellness Boost</h4>', unsafe_allow_html=True)
-            st.markdown(summary["motivation"], unsafe_allow_html=True)
+            st.markdown(motivation.result().strip(), unsafe_allow_html=True)
     elif option == "Get Recovery Advice":
         st.markdown('<h3 style="color: #4ecdc4;">🧘 Recovery Coach</h3>', unsafe_allow_html=True)
-        advice = recovery_ai_agent()
-        st.markdown(advice, unsafe_allow_html=True)
+        show_advice(recovery_ai_agent(stream=True, bundled=bundled))
     elif option == "Weekly Goal Recommender":
         st.markdown('<h3 style="color: #4ecdc4;">🎯 Weekly Goals</h3>', unsafe_allow_html=True)
-        goals = weekly_goal_recommender()
-        st.markdown(goals, unsafe_allow_html=True)
+        show_advice(weekly_goal_recommender(stream=True, bundled=bundled))
     elif option == "Recovery Schedule":
         st.markdown('<h3 style="color: #4ecdc4;">📅 Recovery Plan</h3>', unsafe_allow_html=True)
-        schedule = recovery_schedule()
-        st.markdown(schedule, unsafe_allow_html=True)
+        show_advice(recovery_schedule(stream=True))
     elif option == "Budget vs. Food Analysis":
         st.markdown('<h3 style="color: #4ecdc4;">🍴 Budget vs. Nutrition</h3>', unsafe_allow_html=True)
-        analysis = budget_food_analysis()
-        st.markdown(analysis, unsafe_allow_html=True)
+        show_advice(budget_food_analysis(stream=True))
     elif option == "Holistic Wellness Report":
         st.markdown('<h3 style="color: #4ecdc4;">🌍 Holistic Report</h3>', unsafe_allow_html=True)
-        report = holistic_wellness_report()
-        st.markdown(report, unsafe_allow_html=True)
+        show_advice(holistic_wellness_report(stream=True, bundled=bundled))
+    elif option == "Daily Digest":
+        st.markdown('<h3 style="color: #4ecdc4;">🗞️ Daily Digest</h3>', unsafe_allow_html=True)
+        with st.spinner("Asking all coaches at once..."):
+            digest = daily_digest(bundled=bundled)
+        for title, key in [("💡 Money", "finance"), ("🥗 Nutrition", "diet"), ("🧘 Recovery", "recovery"), ("🎯 Weekly Goals", "goals")]:
+            st.markdown(f'<h4 style="color: #4ecdc4;">{title}</h4>', unsafe_allow_html=True)
+            st.markdown(digest[key], unsafe_allow_html=True)
     elif option == "Visualize Data":
         st.markdown('<h3 style="color: #4ecdc4;">📊 Visualize Your Journey</h3>', unsafe_allow_html=True)
         viz_type = st.selectbox("Choose Visualization", ["Finance", "Food", "Sleep", "Exercise"])
         if viz_type == "Finance":
-            viz = visualize_finance()
+            viz = cached_visualization("Finance", data_version(VISUALIZERS["Finance"][0]))
             if "error" in viz:
                 st.error(viz["error"])
             else:
@@ -556,19 +653,19 @@ with st.container():
                 if viz["pie_fig"]:
                     st.plotly_chart(viz["pie_fig"])
         elif viz_type == "Food":
-            viz = visualize_food()
+            viz = cached_visualization("Food", data_version(VISUALIZERS["Food"][0]))
             if "error" in viz:
                 st.error(viz["error"])
             else:
                 st.plotly_chart(viz["fig"])
         elif viz_type == "Sleep":
-            viz = visualize_sleep()
+            viz = cached_visualization("Sleep", data_version(VISUALIZERS["Sleep"][0]))
             if "error" in viz:
                 st.error(viz["error"])
             else:
                 st.plotly_chart(viz["fig"])
         elif viz_type == "Exercise":
-            viz = visualize_exercise()
+            viz = cached_visualization("Exercise", data_version(VISUALIZERS["Exercise"][0]))
             if "error" in viz:
                 st.error(viz["error"])
             else:
@@ -0,0 +1,330 @@
+import argparse
+import io
+import json
+import os
+import re
+import numpy as np
+import pandas as pd
+from log_index import TransactionHashIndex, attached_view
+from log_store import open_store
+from timestamps import format_timestamps
+
+# 🏦 Streaming bank-statement import into the finance log
+# CSV, OFX and QIF exports are read in chunks of CHUNK_ROWS transactions, so
+# memory stays flat however long the statement is. Each chunk is mapped onto
+# date/type/amount/category/note by the rules below, checked against a hash
+# index of the rows already logged, and appended in one batch.
+#
+#   python bank_import.py statement.csv --rules bank_rules.json --dry-run
+#   python bank_import.py export.ofx --backend sqlite --data-dir data
+#
+# Rules file (JSON, merged over DEFAULT_RULES; category rules are tried first):
+#   {"columns": {"date": ["txn date"], "description": ["narration"]},
+#    "dayfirst": false, "categories": [{"match": "big ?basket", "category": "food"}]}
+
+CHUNK_ROWS = int(os.environ.get("LIFESYNC_IMPORT_CHUNK", 20000))
+
+DEFAULT_RULES = {
+    # Header names (case-insensitive) tried in order for each field
+    "columns": {
+        "date": ["date", "transaction date", "txn date", "value date", "posting date", "posted date", "booking date"],
+        "amount": ["amount", "transaction amount", "amount (inr)", "value"],
+        "debit": ["debit", "withdrawal", "withdrawal amt.", "withdrawal amount", "paid out", "money out"],
+        "credit": ["credit", "deposit", "deposit amt.", "deposit amount", "paid in", "money in"],
+        "type": ["type", "dr/cr", "cr/dr", "transaction type", "debit/credit"],
+        "description": ["description", "narration", "details", "particulars", "payee", "memo", "remarks", "name"],
+        "category": ["category"]
+    },
+    "date_format": None,          # strftime pattern; inferred when None
+    "dayfirst": True,             # 03/04/2025 is 3 April unless the file proves otherwise
+    "qif_dayfirst": False,        # QIF (Quicken) dates are month-first: D04/09/2025 is 9 April
+    "expense_sign": "negative",   # single amount column: which sign is money out
+    "delimiter": ",",
+    "skip_rows": 0,               # preamble lines before the CSV header
+    "encoding": "utf-8-sig",
+    # First matching pattern (regex on the description) sets the category;
+    # otherwise the file's own category, then the default for the type
+    "categories": [
+        {"match": "salary|payroll", "category": "salary"},
+        {"match": "swiggy|zomato|restaurant|cafe|grocer|bigbasket|blinkit|zepto", "category": "food"},
+        {"match": "uber|ola|rapido|irctc|metro|fuel|petrol|airline|indigo", "category": "travel"},
+        {"match": "rent|landlord", "category": "rent"},
+        {"match": "electricity|water bill|broadband|recharge|airtel|jio|insurance", "category": "bills"},
+        {"match": "amazon|flipkart|myntra|ajio", "category": "shopping"},
+        {"match": "pharmacy|hospital|clinic|apollo|medplus", "category": "health"},
+        {"match": "netflix|spotify|bookmyshow|prime video|hotstar", "category": "fun"}
+    ],
+    "default_category": {"expense": "other", "income": "income"}
+}
+
+DEBIT_WORDS = {"dr", "debit", "d", "withdrawal", "expense", "out"}
+CREDIT_WORDS = {"cr", "credit", "c", "deposit", "income", "in"}
+
+
+def load_rules(path=None):
+    rules = json.loads(json.dumps(DEFAULT_RULES))
+    if not path:
+        return rules
+    with open(path, encoding="utf-8") as f:
+        custom = json.load(f)
+    for field, names in custom.pop("columns", {}).items():
+        rules["columns"][field] = [n.lower() for n in names] + rules["columns"].get(field, [])
+    rules["categories"] = custom.pop("categories", []) + rules["categories"]
+    rules["default_category"].update(custom.pop("default_category", {}))
+    rules.update(custom)
+    return rules
+
+
+def open_text(source, encoding):
+    # Path, text stream or binary stream (e.g. an uploaded file) -> text stream
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, encoding=encoding, errors="replace", newline="")
+    if isinstance(source, io.TextIOBase):
+        return source
+    return io.TextIOWrapper(source, encoding=encoding, errors="replace", newline="")
+
+
+def statement_format(source, name=None):
+    name = str(name or getattr(source, "name", None) or (source if isinstance(source, (str, os.PathLike)) else "")).lower()
+    for ext in ("ofx", "qfx", "qif"):
+        if name.endswith(f".{ext}"):
+            return "qif" if ext == "qif" else "ofx"
+    return "csv"
+
+
+# 📄 Readers: each yields raw chunks with some of date/amount/debit/credit/type/description/category
+def read_csv_chunks(stream, rules, chunksize):
+    reader = pd.read_csv(stream, chunksize=chunksize, dtype=str, keep_default_na=False, na_values=[""],
+                         sep=rules["delimiter"], skiprows=rules["skip_rows"], skipinitialspace=True)
+    columns = None
+    for chunk in reader:
+        if columns is None:
+            header = {str(c).strip().lower(): c for c in chunk.columns}
+            columns = {}
+            for field, names in rules["columns"].items():
+                found = next((header[n] for n in names if n in header), None)
+                if found is not None and found not in columns.values():
+                    columns[field] = found
+            if "date" not in columns or not {"amount", "debit", "credit"} & set(columns):
+                raise ValueError(f"Could not find date and amount columns in {list(chunk.columns)}; map them in the rules file.")
+        yield pd.DataFrame({field: chunk[col].to_numpy() for field, col in columns.items()})
+
+
+def read_ofx_chunks(stream, chunksize, block=1 << 20):
+    # SGML (OFX 1.x, leaf tags unclosed) and XML (OFX 2.x) alike: scan tags and
+    # collect each <STMTTRN> aggregate, reading the file a block at a time
+    token = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+    rows, current, rest = [], None, ""
+    while True:
+        data = stream.read(block)
+        text = rest + (data or "")
+        cut = text.rfind("<") if data else len(text)
+        rest, text = text[cut:], text[:cut]
+        for closing, tag, value in token.findall(text):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing and current is not None:
+                    rows.append(current)
+                current = None if closing else {}
+            elif current is not None and not closing:
+                current[tag] = value.strip()
+        if len(rows) >= chunksize or (not data and rows):
+            yield ofx_frame(rows)
+            rows = []
+        if not data:
+            return
+
+
+def ofx_frame(rows):
+    frame = pd.DataFrame(rows).reindex(columns=["DTPOSTED", "TRNAMT", "NAME", "MEMO"])
+    description = frame["NAME"].fillna("")
+    memo = frame["MEMO"].fillna("")
+    return pd.DataFrame({
+        "date": frame["DTPOSTED"].str[:8],
+        "amount": frame["TRNAMT"],
+        "description": description.where(memo.eq("") | memo.eq(description), description + " " + memo).str.strip()
+    })
+
+
+def read_qif_chunks(stream, chunksize):
+    # One field per line (D date, T/U amount, P payee, M memo, L category), "^" ends a record
+    rows, current = [], {}
+    for line in stream:
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("!"):
+            continue
+        code, value = line[0], line[1:].strip()
+        if code == "^":
+            if current:
+                rows.append(current)
+            current = {}
+            if len(rows) >= chunksize:
+                yield qif_frame(rows)
+                rows = []
+        elif code in "DTUPML" and code not in current:
+            current[code] = value
+    if current:
+        rows.append(current)
+    if rows:
+        yield qif_frame(rows)
+
+
+def qif_frame(rows):
+    frame = pd.DataFrame(rows).reindex(columns=list("DTUPML")).astype("string")
+    payee = frame["P"].fillna("")
+    memo = frame["M"].fillna("")
+    return pd.DataFrame({
+        "date": frame["D"].str.replace("'", "/", regex=False),
+        "amount": frame["T"].fillna(frame["U"]),
+        "description": payee.where(memo.eq("") | memo.eq(payee), payee + " " + memo).str.strip(),
+        "category": frame["L"].str.split(":").str[0]
+    })
+
+
+def read_statement(source, rules=None, chunksize=CHUNK_ROWS, name=None):
+    rules = rules or DEFAULT_RULES
+    kind = statement_format(source, name)
+    stream = open_text(source, rules["encoding"])
+    try:
+        if kind == "ofx":
+            yield from read_ofx_chunks(stream, chunksize)
+        elif kind == "qif":
+            yield from read_qif_chunks(stream, chunksize)
+        else:
+            yield from read_csv_chunks(stream, rules, chunksize)
+    finally:
+        if isinstance(source, (str, os.PathLike)):
+            stream.close()
+        elif stream is not source:
+            stream.detach()  # leave the caller's binary stream open
+
+
+# 🧭 Mapping: raw chunk -> finance rows
+def parse_amounts(values):
+    # "₹1,234.50", "(250.00)", "-99", "1,200.00 Cr" -> signed floats (Cr/Dr suffix sets the sign)
+    text = pd.Series(values, dtype="string").str.strip().str.lower()
+    negative = text.str.startswith("(") | text.str.startswith("-") | text.str.endswith("dr")
+    number = pd.to_numeric(text.str.replace(r"[^0-9.]", "", regex=True).replace("", pd.NA), errors="coerce")
+    return number.where(~negative.fillna(False), -number).astype(float)
+
+
+def parse_dates(values, rules, state):
+    # The inferred format is fixed on the first chunk (state) so every chunk reads alike
+    values = pd.Series(values, dtype="string").str.strip()
+    fmt = rules.get("date_format") or state.get("date_format")
+    if fmt:
+        return pd.to_datetime(values, format=fmt, errors="coerce")
+    sample = values.dropna()
+    day_month = ["%d/%m/%Y", "%d/%m/%y", "%d-%m-%Y"]
+    month_day = ["%m/%d/%Y", "%m/%d/%y", "%m-%d-%Y"]
+    numeric = day_month + month_day if rules["dayfirst"] else month_day + day_month
+    for candidate in ["%Y%m%d", "%Y-%m-%d", "%Y-%m-%d %H:%M:%S"] + numeric + ["%d %b %Y", "%d-%b-%Y", "%d-%b-%y", "%b %d, %Y"]:
+        parsed = pd.to_datetime(sample.head(200), format=candidate, errors="coerce")
+        if len(sample) and parsed.notna().all():
+            state["date_format"] = candidate
+            return pd.to_datetime(values, format=candidate, errors="coerce")
+    return pd.to_datetime(values, format="mixed", dayfirst=rules["dayfirst"], errors="coerce")
+
+
+def to_finance_rows(raw, rules, state):
+    # -> (finance frame, number of rows that could not be read)
+    index = raw.index
+    if "amount" in raw.columns:
+        signed = parse_amounts(raw["amount"])
+        if rules["expense_sign"] == "positive":
+            signed = -signed
+    else:
+        debit = parse_amounts(raw["debit"]).abs() if "debit" in raw.columns else pd.Series(np.nan, index=index)
+        credit = parse_amounts(raw["credit"]).abs() if "credit" in raw.columns else pd.Series(np.nan, index=index)
+        signed = credit.where(credit.fillna(0) > 0, -debit)
+    if "type" in raw.columns:
+        # An explicit Dr/Cr column wins over the sign
+        marker = raw["type"].astype("string").str.strip().str.lower()
+        signed = signed.mask(marker.isin(DEBIT_WORDS).fillna(False).to_numpy(dtype=bool), -signed.abs())
+        signed = signed.mask(marker.isin(CREDIT_WORDS).fillna(False).to_numpy(dtype=bool), signed.abs())
+    t_type = pd.Series(np.where(signed < 0, "expense", "income"), index=index)
+
+    # Descriptions repeat a lot in a statement: clean and categorise each distinct one once
+    description = raw["description"] if "description" in raw.columns else pd.Series("", index=index)
+    codes, texts = pd.factorize(description.fillna(""))
+    texts = pd.Series(texts, dtype="string").str.split().str.join(" ")
+    lowered = texts.str.lower()
+    matched = pd.Series(pd.NA, index=texts.index, dtype="string")
+    for rule in rules["categories"]:
+        open_rows = matched.isna()
+        hit = lowered[open_rows].str.contains(rule["match"], regex=True, na=False)
+        matched[hit[hit].index] = rule["category"]
+    note = pd.Series(texts.to_numpy(dtype=object)[codes], index=index)
+    category = pd.Series(matched.to_numpy(dtype=object)[codes], index=index, dtype="string")
+    if "category" in raw.columns:
+        category = category.fillna(raw["category"].astype("string").str.strip().str.lower().replace("", pd.NA))
+    category = category.fillna(t_type.map(rules["default_category"]).astype("string"))
+
+    stamps = format_timestamps(parse_dates(raw["date"], rules, state))
+    valid = (stamps.notna() & signed.notna() & signed.ne(0)).to_numpy()
+    rows = pd.DataFrame({
+        "date": stamps[valid],
+        "type": t_type[valid],
+        "amount": signed[valid].abs(),
+        "category": category[valid].astype(object),
+        "note": note[valid]
+    })
+    return rows, int((~valid).sum())
+
+
+def statement_hash_index(finance_store):
+    return attached_view(finance_store, "hash_index", TransactionHashIndex)
+
+
+def import_statement(source, finance_store, rules=None, chunksize=CHUNK_ROWS, name=None, dry_run=False):
+    rules = rules or load_rules()
+    report = {"read": 0, "imported": 0, "duplicates": 0, "invalid": 0, "chunks": 0, "income": 0.0, "expense": 0.0}
+    index = statement_hash_index(finance_store)
+    finance_store.refresh()
+    if statement_format(source, name) == "qif":
+        rules = {**rules, "dayfirst": rules.get("qif_dayfirst", False)}
+    seen, state = {}, {}
+    with finance_store.batch():
+        for raw in read_statement(source, rules, chunksize, name):
+            rows, invalid = to_finance_rows(raw, rules, state)
+            new = index.is_new(index.hashes(rows["date"], rows["type"], rows["amount"], rows["note"]), seen)
+            rows = rows[new]
+            report["chunks"] += 1
+            report["read"] += len(raw)
+            report["invalid"] += invalid
+            report["duplicates"] += int((~new).sum())
+            report["imported"] += len(rows)
+            for t_type, amount in rows.groupby("type")["amount"].sum().items():
+                report[t_type] += float(amount)
+            if not dry_run and not rows.empty:
+                finance_store.append(rows)
+    return report
+
+
+def summarize(report, dry_run=False):
+    verb = "would import" if dry_run else "imported"
+    line = f"🏦 Read {report['read']:,} transactions, {verb} {report['imported']:,} (income ₹{report['income']:,.2f}, expense ₹{report['expense']:,.2f})"
+    if report["duplicates"]:
+        line += f", skipped {report['duplicates']:,} already logged"
+    if report["invalid"]:
+        line += f", ⚠️ {report['invalid']:,} rows without a readable date or amount"
+    return line
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a bank statement (CSV, OFX or QIF) into the finance log.")
+    parser.add_argument("statement")
+    parser.add_argument("--rules", default=os.environ.get("LIFESYNC_BANK_RULES"), help="JSON file with column and category rules")
+    parser.add_argument("--data-dir", default=".")
+    parser.add_argument("--backend", default=os.environ.get("LIFESYNC_STORE", "csv"))
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--dry-run", action="store_true", help="report what would be imported without writing")
+    args = parser.parse_args()
+
+    store = open_store("finance", backend=args.backend, data_dir=args.data_dir)
+    report = import_statement(args.statement, store, load_rules(args.rules), args.chunk_size, dry_run=args.dry_run)
+    print(summarize(report, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import os
+import tempfile
+import time
+import fit_fetch
+import google_fit
+from fake_fit import FakeFitService, load_recording, synthetic_sessions
+from log_store import open_store
+
+# ⏱️ Google Fit sync benchmark against the offline fake service
+# Reports first-sync time against history length and session count, plus a
+# repeat sync that should find nothing new.
+#
+#   python bench_fit_sync.py --days 7 30 90 --per-day 2 8 --latency 0.05
+#   python bench_fit_sync.py --recording fit_recording.json
+
+
+def run_case(sessions, metrics, days, args):
+    service = FakeFitService(sessions, metrics, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=args.seed)
+    fit_fetch.fetcher = fit_fetch.FitFetcher(workers=args.workers, rate=args.qps, base_delay=args.base_delay)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = open_store("exercise", data_dir=tmp)
+        state_path = os.path.join(tmp, "fit_sync_state.json")
+
+        def log_chunk(df):
+            google_fit.log_fit_to_exercise(store, df)
+
+        report = fit_fetch.FetchReport()
+        t0 = time.perf_counter()
+        synced = google_fit.sync_fit_sessions(service, log_chunk, state_path=state_path, default_hours=days * 24, report=report)
+        first = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        google_fit.sync_fit_sessions(service, log_chunk, state_path=state_path, report=fit_fetch.FetchReport())
+        repeat = time.perf_counter() - t0
+        return {
+            "days": days,
+            "sessions": len(service.recorded),
+            "synced": len(synced),
+            "logged": len(store.frame()),
+            "requests": report.requests,
+            "retries": report.retries,
+            "failed": len(report.failures),
+            "first_s": first,
+            "repeat_s": repeat
+        }
+
+
+def print_rows(rows):
+    cols = ["days", "sessions", "synced", "logged", "requests", "retries", "failed", "first_s", "repeat_s"]
+    print("  ".join(f"{c:>9}" for c in cols))
+    for row in rows:
+        print("  ".join(f"{row[c]:>9.3f}" if isinstance(row[c], float) else f"{row[c]:>9}" for c in cols))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Google Fit sync against the offline fake service.")
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 30, 90])
+    parser.add_argument("--per-day", type=int, nargs="+", default=[2, 8])
+    parser.add_argument("--recording", help="JSON file with recorded sessions/metrics to replay")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every fake request")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 429/503")
+    parser.add_argument("--workers", type=int, default=fit_fetch.FIT_WORKERS)
+    parser.add_argument("--qps", type=float, default=50.0)
+    parser.add_argument("--base-delay", type=float, default=0.05, help="first retry backoff in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = []
+    if args.recording:
+        sessions, metrics = load_recording(args.recording)
+        ends = [int(s["endTimeMillis"]) for s in sessions]
+        days = max(1, -(-(int(time.time() * 1000) - min(ends)) // (24 * 60 * 60 * 1000))) if ends else 1
+        rows.append(run_case(sessions, metrics, days, args))
+    else:
+        for days in args.days:
+            for per_day in args.per_day:
+                sessions, metrics = synthetic_sessions(days, per_day, seed=args.seed)
+                rows.append(run_case(sessions, metrics, days, args))
+    print_rows(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from timestamps import format_timestamps, parse_timestamps
+
+# ⏱️ Benchmark for the Life_final entry points on synthetic logs
+# Every size runs in its own process, in a scratch directory, with the LLM client
+# stubbed out. Latency and peak traced memory are recorded per function and
+# compared with a saved baseline; a regression makes the run exit non-zero.
+#
+#   python bench_lifesync.py --sizes 10000 100000 --save-baseline
+#   python bench_lifesync.py --sizes 10000 100000
+
+BASELINE_FILE = "bench_baseline.json"
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Baselines are machine-specific, so they live with the user's results, not in the repo
+RESULTS_DIR = os.environ.get("LIFESYNC_BENCH_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "lifesync")
+
+READERS = [
+    "show_finance_summary", "show_food_summary", "show_wellness_summary", "show_daily_breakdown",
+    "visualize_finance", "visualize_food", "visualize_sleep", "visualize_exercise"
+]
+LOGGERS = {
+    "add_transaction": ("expense", 250, "food", "bench"),
+    "log_meal": ("lunch", "rice", 2),
+    "log_sleep": ("23:00", "06:30", 30),
+    "log_exercise": ("running", 30, "moderate", 140, 4000)
+}
+
+
+# 🎲 Synthetic logs: one row per event spread over a history that grows with size
+def synthetic_logs(size, food_db, seed=0, end=None):
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or datetime.now().replace(second=0, microsecond=0))
+    days = max(30, size // 40)
+
+    def stamps(n, day_only=False):
+        offsets = np.sort(rng.integers(0, days * 24 * 60, n))
+        times = pd.Series(end - pd.to_timedelta(days * 24 * 60 - offsets, unit="min"))
+        return format_timestamps(times.dt.normalize() if day_only else times).to_numpy()
+
+    is_income = rng.random(size) < 0.15
+    finance = pd.DataFrame({
+        "date": stamps(size),
+        "type": np.where(is_income, "income", "expense"),
+        "amount": np.where(is_income, rng.integers(20000, 90000, size), rng.lognormal(5.5, 1.0, size).round(2)),
+        "category": np.where(is_income, "salary", rng.choice(["food", "rent", "travel", "shopping", "bills", "fun", "health"], size)),
+        "note": rng.choice(["", "upi", "card", "cash"], size)
+    })
+
+    items = list(food_db)
+    picked = rng.choice(items, size)
+    quantity = rng.integers(1, 4, size)
+    food = pd.DataFrame({
+        "datetime": stamps(size),
+        "meal": rng.choice(["breakfast", "lunch", "dinner", "snack"], size),
+        "item": picked,
+        "quantity": quantity,
+        "calories": np.array([food_db[i]["cal"] for i in picked]) * quantity,
+        "category": [food_db[i]["cat"] for i in picked]
+    })
+
+    sleep_start = rng.integers(21 * 60, 25 * 60, size)
+    sleep_hours = rng.normal(7.2, 1.0, size).clip(3, 11).round(2)
+    wake = (sleep_start + sleep_hours * 60).astype(int)
+    sleep = pd.DataFrame({
+        "date": stamps(size, day_only=True),
+        "sleep_time": [f"{m // 60 % 24:02d}:{m % 60:02d}" for m in sleep_start],
+        "wake_time": [f"{m // 60 % 24:02d}:{m % 60:02d}" for m in wake],
+        "screen_before_bed": rng.integers(0, 120, size),
+        "wake_fresh": rng.choice(["yes", "no"], size),
+        "hours": sleep_hours,
+        "mood": rng.choice(["happy", "tired", "relaxed", "stressed", "calm", "neutral"], size)
+    })
+
+    intensity = rng.choice(["low", "moderate", "high"], size)
+    duration = rng.integers(10, 90, size).astype(float)
+    exercise = pd.DataFrame({
+        "date": stamps(size, day_only=True),
+        "type": rng.choice(["running", "yoga", "cycling", "weightlifting", "walking"], size),
+        "duration": duration,
+        "intensity": intensity,
+        "est_calories": duration * pd.Series(intensity).map({"low": 4, "moderate": 6, "high": 9}).to_numpy(),
+        "heart_rate": rng.integers(80, 175, size),
+        "steps": rng.integers(0, 12000, size),
+        "notes": ""
+    })
+    return {"finance": finance, "food": food, "sleep": sleep, "exercise": exercise}
+
+
+# 🤖 Offline stand-ins for the OpenAI-compatible clients
+class StubMessage:
+    def __init__(self, content):
+        self.message = type("Message", (), {"content": content})()
+
+
+class StubCompletions:
+    def create(self, messages=None, stream=False, **kwargs):
+        response = type("Response", (), {"choices": [StubMessage("Stubbed advice.")]})()
+        return iter([]) if stream else response
+
+
+class StubAsyncCompletions:
+    async def create(self, messages=None, **kwargs):
+        return StubCompletions().create(messages)
+
+
+class StubClient:
+    def __init__(self, *args, **kwargs):
+        self.chat = type("Chat", (), {"completions": StubCompletions()})()
+
+
+class StubAsyncClient:
+    def __init__(self, *args, **kwargs):
+        self.chat = type("Chat", (), {"completions": StubAsyncCompletions()})()
+
+
+def measure(fn, repeat=1, traced=True):
+    # Best-of-repeat wall time with tracing off, then one traced run for the
+    # allocation peak (tracemalloc slows pandas code down several times)
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    peak = None
+    if traced:
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return {"seconds": min(times), "peak_mb": peak}
+
+
+def run_size(size, seed):
+    import openai
+    openai.OpenAI, openai.AsyncOpenAI = StubClient, StubAsyncClient
+    os.environ["LIFESYNC_LLM_CACHE_FILE"] = os.path.join(os.getcwd(), "llm_cache.db")
+    results = {}
+    results["import"] = measure(lambda: __import__("Life_final"), traced=False)
+    import Life_final as L
+
+    logs = synthetic_logs(size, L.food_db, seed)
+    stores = {"finance": L.finance_store, "food": L.food_store, "sleep": L.sleep_store, "exercise": L.exercise_store}
+    for name, store in stores.items():
+        store._rewrite(logs[name])
+        results[f"load_{name}"] = measure(store.load)
+
+    repeat = 3 if size <= 100000 else 1
+    day = parse_timestamps(logs["food"]["datetime"]).iloc[-1].date()
+    for name in READERS:
+        fn = getattr(L, name)
+        results[name] = measure((lambda: fn(day)) if name == "show_daily_breakdown" else fn, repeat)
+    calls = 10
+    for name, args in LOGGERS.items():
+        fn = getattr(L, name)
+        # Appends are written by a background thread: each call's flush is part of its cost
+        result = measure(lambda: [(fn(*args), [store.flush() for store in stores.values()]) for _ in range(calls)])
+        result["seconds"] /= calls
+        results[name] = result
+    return results
+
+
+def compare(results, baseline, tolerance, min_seconds):
+    regressions = []
+    for size, functions in results.items():
+        for name, now in functions.items():
+            then = baseline.get(size, {}).get(name)
+            if not then:
+                continue
+            slower = now["seconds"] > then["seconds"] * tolerance and now["seconds"] - then["seconds"] > min_seconds
+            bigger = now["peak_mb"] is not None and then["peak_mb"] is not None and now["peak_mb"] > then["peak_mb"] * tolerance and now["peak_mb"] - then["peak_mb"] > 1
+            if slower or bigger:
+                line = f"{name} @ {size} rows: {then['seconds']:.4f}s -> {now['seconds']:.4f}s"
+                if bigger:
+                    line += f", peak {then['peak_mb']:.1f} MB -> {now['peak_mb']:.1f} MB"
+                regressions.append(line)
+    return regressions
+
+
+def print_results(results, baseline):
+    for size, functions in results.items():
+        print(f"\n📏 {int(size):,} rows per log")
+        print(f"{'function':<24}{'seconds':>10}{'peak MB':>10}{'baseline s':>12}")
+        for name, r in functions.items():
+            then = baseline.get(size, {}).get(name)
+            ref = f"{then['seconds']:>12.4f}" if then else f"{'-':>12}"
+            peak = f"{r['peak_mb']:>10.1f}" if r["peak_mb"] is not None else f"{'-':>10}"
+            print(f"{name:<24}{r['seconds']:>10.4f}{peak}{ref}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Life_final entry points on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=os.path.join(RESULTS_DIR, BASELINE_FILE), help="baseline JSON (default: %(default)s)")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="allowed slowdown / memory growth ratio")
+    parser.add_argument("--min-seconds", type=float, default=0.005, help="ignore slowdowns smaller than this")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(run_size(args.worker, args.seed), f)
+        return
+
+    results = {}
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, "result.json")
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [HERE, os.environ.get("PYTHONPATH")])))
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", str(size), "--seed", str(args.seed), "--out", out], cwd=tmp, env=env, check=True)
+            with open(out, encoding="utf-8") as f:
+                results[str(size)] = json.load(f)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        baseline.update(results)
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+        return
+    regressions = compare(results, baseline, args.tolerance, args.min_seconds)
+    if regressions:
+        print("\n🚨 REGRESSIONS")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    if baseline:
+        print("\n✅ No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
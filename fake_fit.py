@@ -0,0 +1,140 @@
+import json
+import random
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+import httplib2
+from googleapiclient.errors import HttpError
+from google_fit import activity_types, fit_metrics, sleep_types
+
+# 🧪 Offline stand-in for the Google Fit service
+# Drop-in for init_fit_service()'s result: answers users().sessions().list and
+# users().dataset().aggregate (bucketBySession) from recorded or synthetic
+# sessions, with optional latency and injected HTTP errors, so syncs can be
+# benchmarked without a Google account.
+
+HOUR_MS = 60 * 60 * 1000
+
+
+def synthetic_sessions(days=30, per_day=4, end_ms=None, seed=0):
+    rng = random.Random(seed)
+    end_ms = end_ms or int(time.time() * 1000)
+    start_ms = end_ms - days * 24 * HOUR_MS
+    codes = [c for c in activity_types if c not in (3, 4, 83)]
+    sessions, metrics = [], {}
+    for i in range(days * per_day):
+        begin = start_ms + int(i * 24 * HOUR_MS / per_day) + rng.randint(0, HOUR_MS)
+        code = rng.choice(codes)
+        minutes = rng.randint(10, 90)
+        sess_id = f"fake-{seed}-{i}"
+        sessions.append({
+            "id": sess_id,
+            "name": f"{activity_types[code]} session",
+            "activityType": code,
+            "startTimeMillis": str(begin),
+            "endTimeMillis": str(begin + minutes * 60 * 1000)
+        })
+        metrics[sess_id] = {
+            "com.google.step_count.delta": rng.randint(500, 12000),
+            "com.google.distance.delta": round(rng.uniform(200, 10000), 1),
+            "com.google.calories.expended": round(rng.uniform(50, 700), 1)
+        }
+    return sessions, metrics
+
+
+def save_recording(path, sessions, metrics):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"sessions": sessions, "metrics": metrics}, f)
+
+
+def load_recording(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data["sessions"], data.get("metrics", {})
+
+
+def parse_rfc(value):
+    return int(datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc).timestamp() * 1000)
+
+
+class FakeRequest:
+    def __init__(self, service, kind, respond):
+        self.service = service
+        self.kind = kind
+        self.respond = respond
+
+    def execute(self, http=None, num_retries=0):
+        return self.service.serve(self.kind, self.respond)
+
+
+class FakeFitService:
+    def __init__(self, sessions=None, metrics=None, latency=0.0, jitter=0.0, error_rate=0.0, error_statuses=(429, 503), page_size=100, seed=0):
+        if sessions is None:
+            sessions, metrics = synthetic_sessions(seed=seed)
+        self.recorded = sorted(sessions, key=lambda s: int(s["endTimeMillis"]))
+        self.ends = [int(s["endTimeMillis"]) for s in self.recorded]
+        self.metrics = metrics or {}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.page_size = page_size
+        self.calls = {"list": 0, "aggregate": 0, "errors": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    # Resource chain: service.users().sessions().list(...) / .dataset().aggregate(...)
+    def users(self):
+        return self
+
+    def sessions(self):
+        return self
+
+    def dataset(self):
+        return self
+
+    def serve(self, kind, respond):
+        with self._lock:
+            self.calls[kind] += 1
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            status = self._rng.choice(self.error_statuses) if self._rng.random() < self.error_rate else None
+            if status:
+                self.calls["errors"] += 1
+        if delay:
+            time.sleep(delay)
+        if status:
+            raise HttpError(httplib2.Response({"status": status}), b'{"error": "injected"}')
+        return respond()
+
+    def list(self, userId, startTime, endTime, pageToken=None):
+        def respond():
+            # Sessions that ended in [startTime, endTime), one page at a time
+            lo = bisect_left(self.ends, parse_rfc(startTime))
+            hi = bisect_left(self.ends, parse_rfc(endTime))
+            offset = lo + int(pageToken or 0)
+            page = self.recorded[offset:min(offset + self.page_size, hi)]
+            resp = {"session": page}
+            if offset + self.page_size < hi:
+                resp["nextPageToken"] = str(offset + self.page_size - lo)
+            return resp
+        return FakeRequest(self, "list", respond)
+
+    def aggregate(self, userId, body):
+        def respond():
+            start, end = int(body["startTimeMillis"]), int(body["endTimeMillis"])
+            hi = bisect_left(self.ends, end + 1)
+            buckets = []
+            for sess in self.recorded[bisect_left(self.ends, start):hi]:
+                if int(sess["startTimeMillis"]) < start:
+                    continue
+                points = []
+                sleeping = activity_types.get(sess.get("activityType"), "").lower() in sleep_types
+                for dtype, value in self.metrics.get(sess["id"], {}).items():
+                    if dtype not in fit_metrics or (sleeping and dtype != "com.google.calories.expended"):
+                        continue
+                    key = "intVal" if isinstance(value, int) else "fpVal"
+                    points.append({"dataTypeName": dtype, "value": [{key: value}]})
+                buckets.append({"session": sess, "dataset": [{"point": points}]})
+            return {"bucket": buckets}
+        return FakeRequest(self, "aggregate", respond)
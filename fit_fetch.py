@@ -0,0 +1,163 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 🚦 Fetch engine for Google Fit requests
+# Requests run on a bounded thread pool behind a shared token bucket, so a long
+# backfill uses the quota steadily. Throttling (429) and server errors (5xx) are
+# retried with jittered exponential backoff; anything still failing is recorded
+# in a FetchReport instead of being turned into empty data.
+
+FIT_WORKERS = int(os.environ.get("LIFESYNC_FIT_WORKERS", 4))
+FIT_QPS = float(os.environ.get("LIFESYNC_FIT_QPS", 5))
+FIT_MAX_RETRIES = int(os.environ.get("LIFESYNC_FIT_MAX_RETRIES", 5))
+# Seconds before a stalled connection gives up (and is retried like any timeout)
+FIT_HTTP_TIMEOUT = float(os.environ.get("LIFESYNC_FIT_TIMEOUT", 60))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def error_status(error):
+    resp = getattr(error, "resp", None)
+    status = getattr(resp, "status", None) or getattr(error, "status_code", None)
+    try:
+        return int(status)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error):
+    status = error_status(error)
+    if status is not None:
+        return status in RETRY_STATUSES
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+def retry_after(error):
+    resp = getattr(error, "resp", None)
+    value = resp.get("retry-after") if hasattr(resp, "get") else None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, base_delay=1.0, max_delay=32.0):
+    # Full jitter: concurrent workers that were throttled together spread out
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+class FetchReport:
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.failures = []
+        self._lock = threading.Lock()
+
+    def count(self, requests=0, retries=0):
+        with self._lock:
+            self.requests += requests
+            self.retries += retries
+
+    def merge(self, other):
+        with self._lock:
+            self.requests += other.requests
+            self.retries += other.retries
+            self.failures.extend(other.failures)
+
+    def fail(self, label, error):
+        with self._lock:
+            self.failures.append({"request": label, "status": error_status(error), "error": str(error)})
+
+    @property
+    def ok(self):
+        return not self.failures
+
+    def summary(self):
+        text = f"{self.requests} Fit requests, {self.retries} retried"
+        if self.failures:
+            text += f", {len(self.failures)} failed ({self.failures[0]['request']}: {self.failures[0]['error']})"
+        return text
+
+
+class FitFetcher:
+    def __init__(self, workers=FIT_WORKERS, rate=FIT_QPS, max_retries=FIT_MAX_RETRIES, base_delay=1.0, max_delay=32.0):
+        self.workers = workers
+        self.limiter = TokenBucket(rate)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fit-fetch")
+        self._local = threading.local()
+
+    def _http(self, request):
+        # httplib2 connections are not thread-safe: give each worker its own,
+        # authorised with the credentials of the service that built the request
+        http = getattr(request, "http", None)
+        credentials = getattr(http, "credentials", None)
+        if credentials is None:
+            return None
+        if getattr(self._local, "credentials", None) is not credentials:
+            import google_auth_httplib2
+            import httplib2
+            self._local.http = google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http(timeout=FIT_HTTP_TIMEOUT))
+            self._local.credentials = credentials
+        return self._local.http
+
+    def execute(self, request, report=None):
+        http = self._http(request)
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            if report is not None:
+                report.count(requests=1)
+            try:
+                return request.execute(http=http) if http is not None else request.execute()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = retry_after(e) or backoff_delay(attempt, self.base_delay, self.max_delay)
+                attempt += 1
+                if report is not None:
+                    report.count(retries=1)
+                time.sleep(delay)
+
+    def map(self, fn, items):
+        # Everything is submitted at once; results are yielded in input order
+        # as they complete. fn handles its own failures.
+        return self.pool.map(fn, items)
+
+
+fetcher = None
+fetcher_lock = threading.Lock()
+
+
+def get_fetcher():
+    global fetcher
+    with fetcher_lock:
+        if fetcher is None:
+            fetcher = FitFetcher()
+        return fetcher
@@ -1,12 +1,21 @@
 import os
+import json
 import pickle
+import threading
+import httplib2
 from google_auth_oauthlib.flow import InstalledAppFlow
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
+from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
 import requests
 from datetime import datetime, timedelta, timezone
 import pandas as pd
 import pytz
+from log_store import CsvLogStore, EXERCISE_COLUMNS
+from log_index import SessionKeyIndex, attached_view
+from timestamps import to_timestamp
+from fit_fetch import FIT_HTTP_TIMEOUT, FetchReport, get_fetcher
 
 # Define activity types mapping
 activity_types = {
@@ -21,53 +30,172 @@ IST = pytz.timezone('Asia/Kolkata')
 def fmt(ms):
     return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M')
 
-def init_fit_service():
-    creds_file = "client_secret.json"
-    creds_path = os.path.join(os.path.dirname(__file__), creds_file)
-    if not os.path.exists(creds_path):
-        raise FileNotFoundError("client_secret.json not found. Please set up Google Fit API credentials.")
+FIT_SCOPES = [
+    "https://www.googleapis.com/auth/fitness.activity.read",
+    "https://www.googleapis.com/auth/fitness.location.read",
+    "https://www.googleapis.com/auth/fitness.body.read",
+    "https://www.googleapis.com/auth/fitness.sleep.read"
+]
+TOKEN_PATH = "token.pickle"
 
-    # Token storage
-    creds = None
-    token_path = "token.pickle"
-    scopes = [
-        "https://www.googleapis.com/auth/fitness.activity.read",
-        "https://www.googleapis.com/auth/fitness.location.read",
-        "https://www.googleapis.com/auth/fitness.body.read",
-        "https://www.googleapis.com/auth/fitness.sleep.read"
-    ]
+# 🔑 One Fit service per process: credentials are loaded once, refreshed with the
+# stored refresh token when they expire, and the browser consent flow only runs
+# when there is no usable token. The service and its keep-alive connection are
+# shared by every caller (Streamlit sessions included).
+fit_service = None
+fit_credentials = None
+fit_service_lock = threading.Lock()
+
+def save_credentials(creds, token_path=TOKEN_PATH):
+    tmp_path = f"{token_path}.tmp"
+    with open(tmp_path, "wb") as token:
+        pickle.dump(creds, token)
+    os.replace(tmp_path, token_path)
 
+def load_credentials(token_path=TOKEN_PATH):
+    creds_path = os.path.join(os.path.dirname(__file__), "client_secret.json")
+    creds = None
     if os.path.exists(token_path):
         with open(token_path, "rb") as token:
             creds = pickle.load(token)
-
+    if creds and not creds.valid and creds.expired and creds.refresh_token:
+        try:
+            creds.refresh(Request())
+            save_credentials(creds, token_path)
+        except RefreshError as e:
+            print(f"⚠️ Google Fit token refresh failed, signing in again: {e}")
+            creds = None
     if not creds or not creds.valid:
-        flow = InstalledAppFlow.from_client_secrets_file(
-            creds_path, scopes
-        )
+        if not os.path.exists(creds_path):
+            raise FileNotFoundError("client_secret.json not found. Please set up Google Fit API credentials.")
+        flow = InstalledAppFlow.from_client_secrets_file(creds_path, FIT_SCOPES)
         creds = flow.run_local_server(port=0)
-        with open(token_path, "wb") as token:
-            pickle.dump(creds, token)
+        save_credentials(creds, token_path)
+    return creds
+
+def init_fit_service(force=False):
+    global fit_service, fit_credentials
+    with fit_service_lock:
+        if fit_service is not None and not force:
+            if fit_credentials.valid:
+                return fit_service
+            if fit_credentials.refresh_token:
+                try:
+                    fit_credentials.refresh(Request())
+                    save_credentials(fit_credentials)
+                    return fit_service
+                except RefreshError as e:
+                    print(f"⚠️ Google Fit token refresh failed, signing in again: {e}")
+        fit_credentials = load_credentials()
+        http = AuthorizedHttp(fit_credentials, http=httplib2.Http(timeout=FIT_HTTP_TIMEOUT))
+        fit_service = build("fitness", "v1", http=http, cache_discovery=False)
+        return fit_service
+
+# Aggregate metrics fetched for every session
+fit_metrics = {
+    'com.google.step_count.delta': "Steps",
+    'com.google.distance.delta': "Distance (m)",
+    'com.google.calories.expended': "Calories"
+}
+
+sleep_types = ["rem sleep", "light sleep", "deep sleep", "sleeping"]
+
+# Longest time range covered by a single session-bucketed aggregate request
+MAX_AGGREGATE_WINDOW_MS = 30 * 24 * 60 * 60 * 1000
+
+def session_key(sess):
+    return sess.get("id") or f"{sess['startTimeMillis']}-{sess['endTimeMillis']}"
+
+def parse_bucket_metrics(bucket):
+    found = {k: None for k in fit_metrics}
+    for ds in bucket.get("dataset", []):
+        for pt in ds.get("point", []):
+            dtype = pt.get("dataTypeName", "")
+            val = pt.get("value", [{}])[0]
+            num = val.get("fpVal") or val.get("intVal")
+            if dtype in fit_metrics:
+                found[dtype] = num
+    return found
+
+def session_windows(sessions, max_window_ms=MAX_AGGREGATE_WINDOW_MS):
+    # Group sessions (sorted by start) into as few aggregate windows as possible
+    windows = []
+    for sess in sorted(sessions, key=lambda s: int(s['startTimeMillis'])):
+        start_ms, end_ms = int(sess['startTimeMillis']), int(sess['endTimeMillis'])
+        if windows and end_ms - windows[-1]["start"] <= max_window_ms:
+            windows[-1]["end"] = max(windows[-1]["end"], end_ms)
+            windows[-1]["sessions"].append(sess)
+        else:
+            windows.append({"start": start_ms, "end": end_ms, "sessions": [sess]})
+    return windows
+
+def get_session_metrics(service, sessions, max_window_ms=MAX_AGGREGATE_WINDOW_MS, report=None, parallel=True):
+    # One aggregate request per window, bucketed by session, instead of one per session.
+    # Sessions of a window that could not be fetched map to None rather than zeros.
+    fetcher = get_fetcher()
+    report = report if report is not None else FetchReport()
+
+    def fetch_window(window):
+        req = {
+            "aggregateBy": [{"dataTypeName": k} for k in fit_metrics],
+            "bucketBySession": {"minDurationMillis": 0},
+            "startTimeMillis": window["start"],
+            "endTimeMillis": window["end"]
+        }
+        try:
+            return window, fetcher.execute(service.users().dataset().aggregate(userId="me", body=req), report)
+        except Exception as e:
+            print(f"⚠️ Error retrieving metrics for {len(window['sessions'])} sessions: {e}")
+            report.fail(f"metrics {fmt(window['start'])} to {fmt(window['end'])}", e)
+            return window, None
+
+    windows = session_windows(sessions, max_window_ms)
+    metrics = {}
+    for window, agg in (fetcher.map(fetch_window, windows) if parallel else map(fetch_window, windows)):
+        if agg is None:
+            for sess in window["sessions"]:
+                metrics[session_key(sess)] = None
+            continue
+        for b in agg.get("bucket", []):
+            sess = b.get("session")
+            if sess:
+                metrics[session_key(sess)] = parse_bucket_metrics(b)
+    return metrics
 
-    return build("fitness", "v1", credentials=creds, cache_discovery=False)
+def rfc(ms):
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).isoformat()
 
-def get_fit_sessions(service, start_hours_ago=24):
-    now = datetime.now(timezone.utc)
-    start = now - timedelta(hours=start_hours_ago)
-    start_rfc = start.isoformat()
-    end_rfc = now.isoformat()
+def list_sessions(service, start_ms, end_ms, report=None):
+    fetcher = get_fetcher()
+    sessions = []
+    page_token = None
+    while True:
+        kwargs = {"userId": "me", "startTime": rfc(start_ms), "endTime": rfc(end_ms)}
+        if page_token:
+            kwargs["pageToken"] = page_token
+        resp = fetcher.execute(service.users().sessions().list(**kwargs), report)
+        sessions.extend(resp.get("session", []))
+        page_token = resp.get("nextPageToken")
+        if not page_token:
+            return sessions
 
-    sessions = service.users().sessions().list(
-        userId="me",
-        startTime=start_rfc,
-        endTime=end_rfc
-    ).execute().get("session", [])
+def get_fit_sessions(service, start_hours_ago=24, start_ms=None, end_ms=None, report=None, parallel=True):
+    if end_ms is None:
+        end_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    if start_ms is None:
+        start_ms = end_ms - start_hours_ago * 60 * 60 * 1000
+
+    sessions = list_sessions(service, start_ms, end_ms, report)
 
     if not sessions:
         return pd.DataFrame()
 
+    metrics = get_session_metrics(service, sessions, report=report, parallel=parallel)
     data = []
     for sess in sessions:
+        found = metrics.get(session_key(sess), {k: None for k in fit_metrics})
+        if found is None:
+            continue  # metrics request failed: leave the session for the next sync
         name = sess.get('name', 'Unnamed')
         atype_code = sess.get('activityType', 4)
         atype = activity_types.get(atype_code, f"Activity Type {atype_code}")
@@ -75,94 +203,135 @@ def get_fit_sessions(service, start_hours_ago=24):
         end_ms = int(sess['endTimeMillis'])
         duration = (end_ms - start_ms) / (1000 * 60)  # Convert to minutes
 
-        # Aggregate Metrics
-        metrics = {
-            'com.google.step_count.delta': "Steps",
-            'com.google.distance.delta': "Distance (m)",
-            'com.google.calories.expended': "Calories"
+        row = {
+            "date": to_timestamp(datetime.fromtimestamp(start_ms / 1000, tz=timezone.utc)),
+            "type": atype,
+            "name": name,
+            "session_id": session_key(sess),
+            "duration_minutes": round(duration, 2),
+            "steps": found['com.google.step_count.delta'],
+            "distance_m": found['com.google.distance.delta'],
+            "calories": found['com.google.calories.expended']
         }
+        # Only set sleep duration, no calories
+        if atype.lower() in sleep_types:
+            row["steps"] = 0
+            row["distance_m"] = 0
+            row["calories"] = None  # Remove calorie estimate
+        data.append(row)
 
-        req = {
-            "aggregateBy": [{"dataTypeName": k} for k in metrics],
-            "bucketByTime": {"durationMillis": end_ms - start_ms},
-            "startTimeMillis": start_ms,
-            "endTimeMillis": end_ms
-        }
+    return pd.DataFrame(data)
 
-        try:
-            agg = service.users().dataset().aggregate(userId="me", body=req).execute()
-            found = {k: None for k in metrics}
-
-            for b in agg.get("bucket", []):
-                for ds in b.get("dataset", []):
-                    dt = ds.get("dataSourceId", "")
-                    for pt in ds.get("point", []):
-                        dtype = pt.get("dataTypeName", "")
-                        val = pt.get("value", [{}])[0]
-                        num = val.get("fpVal") or val.get("intVal")
-                        if dtype in metrics:
-                            found[dtype] = num
-
-            row = {
-                "date": fmt(start_ms),
-                "type": atype,
-                "name": name,
-                "duration_minutes": round(duration, 2),
-                "steps": found['com.google.step_count.delta'],
-                "distance_m": found['com.google.distance.delta'],
-                "calories": found['com.google.calories.expended']
-            }
-            # Only set sleep duration, no calories
-            if atype.lower() in ["rem sleep", "light sleep", "deep sleep", "sleeping"]:
-                row["steps"] = 0
-                row["distance_m"] = 0
-                row["calories"] = None  # Remove calorie estimate
-            data.append(row)
-        except Exception as e:
-            print(f"⚠️ Error retrieving metrics for {name}: {e}")
-            row = {
-                "date": fmt(start_ms),
-                "type": atype,
-                "name": name,
-                "duration_minutes": round(duration, 2),
-                "steps": 0,
-                "distance_m": 0,
-                "calories": 0
-            }
-            if atype.lower() in ["rem sleep", "light sleep", "deep sleep", "sleeping"]:
-                row["calories"] = None  # No calories for sleep
-            data.append(row)
+# 🔁 Incremental sync: the end of the last synced window is persisted, so each
+# sync only asks for sessions that ended since then. Long gaps are fetched in
+# chunks and the mark is saved after every chunk, so an interrupted sync resumes.
+# Each sync also looks back SYNC_OVERLAP_MINUTES before the mark, so a session the
+# phone wrote just as the last sync ran is still picked up; the session keys drop
+# the few that were already logged.
+SYNC_STATE_FILE = "fit_sync_state.json"
+SYNC_CHUNK_HOURS = 7 * 24
+SYNC_OVERLAP_MINUTES = 15
 
-    return pd.DataFrame(data)
+def load_sync_state(state_path=SYNC_STATE_FILE):
+    if os.path.exists(state_path):
+        with open(state_path, encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+def save_sync_state(state, state_path=SYNC_STATE_FILE):
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+def fetch_chunk(service, start_ms, end_ms):
+    report = FetchReport()
+    try:
+        df = get_fit_sessions(service, start_ms=start_ms, end_ms=end_ms, report=report, parallel=False)
+    except Exception as e:
+        print(f"⚠️ Error listing Fit sessions from {fmt(start_ms)} to {fmt(end_ms)}: {e}")
+        report.fail(f"sessions {fmt(start_ms)} to {fmt(end_ms)}", e)
+        df = pd.DataFrame()
+    return df, report
 
-def log_fit_to_exercise(exercise_log_file, fit_data=None):
+def run_sync_window(service, cursor, start_ms, end_ms, on_chunk, state_path=SYNC_STATE_FILE, chunk_hours=SYNC_CHUNK_HOURS, max_chunks=None, report=None):
+    # Chunks are fetched concurrently and handed to on_chunk in order; on_chunk must
+    # persist the chunk. The cursor only moves past chunks that fetched cleanly, so
+    # a chunk with failed requests is fetched again on the next sync.
+    chunk_ms = chunk_hours * 60 * 60 * 1000
+    report = report if report is not None else FetchReport()
+    bounds = []
+    while start_ms < end_ms and (max_chunks is None or len(bounds) < max_chunks):
+        bounds.append((start_ms, min(start_ms + chunk_ms, end_ms)))
+        start_ms = bounds[-1][1]
+    frames = []
+    advancing = True
+    for (_, chunk_end), (df, chunk_report) in zip(bounds, get_fetcher().map(lambda b: fetch_chunk(service, *b), bounds)):
+        report.merge(chunk_report)
+        if not df.empty:
+            on_chunk(df)
+            frames.append(df)
+        advancing = advancing and chunk_report.ok
+        if advancing:
+            state = load_sync_state(state_path)
+            state[cursor] = chunk_end
+            save_sync_state(state, state_path)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def sync_fit_sessions(service, on_chunk, state_path=SYNC_STATE_FILE, default_hours=24, chunk_hours=SYNC_CHUNK_HOURS, max_chunks=None, report=None, overlap_minutes=SYNC_OVERLAP_MINUTES):
+    now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    state = load_sync_state(state_path)
+    if "last_end_ms" in state:
+        start_ms = max(state["last_end_ms"] - overlap_minutes * 60 * 1000, state.get("first_start_ms", 0))
+    else:
+        start_ms = now_ms - default_hours * 60 * 60 * 1000
+    if "first_start_ms" not in state:
+        state["first_start_ms"] = start_ms
+        save_sync_state(state, state_path)
+    return run_sync_window(service, "last_end_ms", start_ms, now_ms, on_chunk, state_path, chunk_hours, max_chunks, report)
+
+def backfill_fit_sessions(service, on_chunk, days=90, state_path=SYNC_STATE_FILE, chunk_hours=SYNC_CHUNK_HOURS, max_chunks=None, report=None):
+    # Walks [now - days, first forward sync) once; resumes from its own cursor
+    state = load_sync_state(state_path)
+    now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    end_ms = state.get("backfill_end_ms") or state.get("first_start_ms") or now_ms
+    start_ms = max(state.get("backfill_next_ms", 0), now_ms - days * 24 * 60 * 60 * 1000)
+    if "backfill_end_ms" not in state:
+        state["backfill_end_ms"] = end_ms
+        save_sync_state(state, state_path)
+    return run_sync_window(service, "backfill_next_ms", start_ms, end_ms, on_chunk, state_path, chunk_hours, max_chunks, report)
+
+def fit_key_index(exercise_store):
+    keys = attached_view(exercise_store, "fit_keys", lambda: SessionKeyIndex("date", "type", "session_id"))
+    # The index is only filled once the log is read; also picks up other processes' rows
+    exercise_store.refresh()
+    return keys
+
+def log_fit_to_exercise(exercise_store, fit_data=None):
+    if isinstance(exercise_store, str):
+        exercise_store = CsvLogStore(exercise_store, EXERCISE_COLUMNS, "date")
     if fit_data is None:
         service = init_fit_service()
         fit_data = get_fit_sessions(service)
     if fit_data.empty:
         return False
 
-    if os.path.exists(exercise_log_file):
-        exercise_log = pd.read_csv(exercise_log_file)
-    else:
-        exercise_log = pd.DataFrame(columns=["date", "type", "duration", "intensity", "est_calories", "heart_rate", "steps", "notes"])
-
-    for _, row in fit_data.iterrows():
-        date = row["date"]
-        atype = row["type"]
-        if not exercise_log[(exercise_log["date"] == date) & (exercise_log["type"] == atype)].empty:
-            continue
-        new_entry = pd.DataFrame([{
-            "date": date,
-            "type": atype,
-            "duration": row["duration_minutes"],
-            "intensity": "auto",
-            "est_calories": row["calories"] if row["calories"] is not None else 0,
-            "heart_rate": 0,
-            "steps": row["steps"] or 0,
-            "notes": f"Imported from Google Fit: {row['name']}"
-        }])
-        exercise_log = pd.concat([exercise_log, new_entry], ignore_index=True)
-
-    exercise_log.to_csv(exercise_log_file, index=False)
+    keys = fit_key_index(exercise_store)
+    new_rows = fit_data[keys.is_new(fit_data["date"], fit_data["type"])]
+    if new_rows.empty:
+        return False
+    new_entries = pd.DataFrame({
+        "date": new_rows["date"].astype(str),
+        "type": new_rows["type"],
+        "duration": new_rows["duration_minutes"],
+        "intensity": "auto",
+        "est_calories": pd.to_numeric(new_rows["calories"], errors="coerce").fillna(0),
+        "heart_rate": 0,
+        "steps": pd.to_numeric(new_rows["steps"], errors="coerce").fillna(0),
+        "notes": "Imported from Google Fit: " + new_rows["name"].astype(str),
+        "session_id": new_rows["session_id"].astype(str) if "session_id" in new_rows else None
+    })
+    exercise_store.append(new_entries.to_dict("records"))
+    # The sync cursor moves on once this returns, so the rows must be on disk
+    exercise_store.flush()
     return True
\ No newline at end of file
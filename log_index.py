@@ -0,0 +1,288 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from timestamps import is_date_only, parse_timestamps
+
+# 📈 Derived views kept in step with a LogStore
+# Each view is registered with store.add_listener(): it is rebuilt once when the
+# store loads or resets, then updated per appended row so reads cost nothing.
+
+
+def attached_view(store, attr, make):
+    # One shared view per store, kept on it as store.<attr>: registered on first use
+    # so callers that never need it don't pay for the rebuild
+    view = getattr(store, attr, None)
+    if view is None:
+        view = store.add_listener(make())
+        setattr(store, attr, view)
+    return view
+
+
+def _timestamps(values):
+    # One vectorised parse for a batch of appended rows
+    return parse_timestamps(list(values))
+
+
+def _day_keys(values):
+    ts = _timestamps(values)
+    return [None if pd.isna(t) else t.date() for t in ts]
+
+
+def _month_keys(values):
+    return [m if isinstance(m, str) else None for m in _timestamps(values).dt.strftime("%Y-%m")]
+
+
+class FinanceAggregates:
+    def __init__(self):
+        self.rebuild(pd.DataFrame(columns=["date", "type", "amount", "category", "note"]))
+
+    def rebuild(self, df):
+        self.totals = defaultdict(float)
+        self.by_category = defaultdict(lambda: defaultdict(float))
+        self.by_month = defaultdict(lambda: defaultdict(float))
+        if df.empty:
+            return
+        amounts = pd.to_numeric(df["amount"], errors="coerce").fillna(0)
+        months = parse_timestamps(df["date"]).dt.strftime("%Y-%m")
+        for t_type, amount in amounts.groupby(df["type"], observed=True).sum().items():
+            self.totals[t_type] = float(amount)
+        for (t_type, cat), amount in amounts.groupby([df["type"], df["category"]], observed=True).sum().items():
+            self.by_category[t_type][cat] = float(amount)
+        for (t_type, month), amount in amounts.groupby([df["type"], months], observed=True).sum().items():
+            self.by_month[t_type][month] = float(amount)
+
+    def add_rows(self, rows):
+        months = _month_keys(row["date"] for row in rows)
+        for row, month in zip(rows, months):
+            amount = float(row["amount"])
+            t_type = row["type"]
+            self.totals[t_type] += amount
+            if not pd.isna(row.get("category")):
+                self.by_category[t_type][row["category"]] += amount
+            if month:
+                self.by_month[t_type][month] += amount
+
+    @property
+    def income(self):
+        return self.totals.get("income", 0.0)
+
+    @property
+    def expense(self):
+        return self.totals.get("expense", 0.0)
+
+    @property
+    def balance(self):
+        return self.income - self.expense
+
+    def category_totals(self, t_type="expense"):
+        return dict(sorted(self.by_category.get(t_type, {}).items()))
+
+    def monthly_totals(self, t_type="expense"):
+        return dict(sorted(self.by_month.get(t_type, {}).items()))
+
+
+class DateIndex:
+    # day -> positions of that day's rows in the store frame, so picking a day
+    # costs O(rows that day) instead of re-parsing the whole date column
+    def __init__(self, date_col):
+        self.date_col = date_col
+        self.rows = {}
+        self.length = 0
+
+    def rebuild(self, df):
+        self.length = len(df)
+        if df.empty:
+            self.rows = {}
+            return
+        days = parse_timestamps(df[self.date_col]).dt.date
+        positions = pd.Series(np.arange(len(df))).groupby(days.to_numpy(), dropna=True).indices
+        self.rows = {day: pos.tolist() for day, pos in positions.items()}
+
+    def add_rows(self, rows):
+        for day in _day_keys(row[self.date_col] for row in rows):
+            if day is not None:
+                self.rows.setdefault(day, []).append(self.length)
+            self.length += 1
+
+    def positions(self, start=None, end=None):
+        start = pd.Timestamp(start).date() if start is not None else None
+        end = pd.Timestamp(end).date() if end is not None else None
+        if start is not None and end is not None and (end - start).days <= len(self.rows):
+            days = (start + timedelta(days=i) for i in range((end - start).days))
+        else:
+            days = (d for d in self.rows if (start is None or d >= start) and (end is None or d < end))
+        return sorted(p for day in days for p in self.rows.get(day, []))
+
+
+def estimate_tokens(text):
+    # ~4 characters per token is close enough for budgeting prompt context
+    return len(text) // 4 + 1
+
+
+class FoodDigest:
+    # Per-day nutrition summaries kept up to date on write, so prompts are built
+    # from a handful of compact lines instead of every logged meal
+    def __init__(self):
+        self.days = {}
+
+    def _day(self, day):
+        if day not in self.days:
+            self.days[day] = {"calories": 0.0, "entries": 0, "meals": defaultdict(float), "categories": defaultdict(int), "items": defaultdict(int)}
+        return self.days[day]
+
+    def rebuild(self, df):
+        self.days = {}
+        if df.empty:
+            return
+        days = parse_timestamps(df["datetime"]).dt.date
+        calories = pd.to_numeric(df["calories"], errors="coerce").fillna(0)
+        quantity = pd.to_numeric(df["quantity"], errors="coerce").fillna(0)
+        for day, total in calories.groupby(days).sum().items():
+            self._day(day)["calories"] = float(total)
+        for day, count in days.value_counts().items():
+            self._day(day)["entries"] = int(count)
+        for (day, meal), total in calories.groupby([days, df["meal"]], observed=True).sum().items():
+            self._day(day)["meals"][meal] = float(total)
+        for (day, cat), count in df.groupby([days, df["category"]], observed=True).size().items():
+            self._day(day)["categories"][cat] = int(count)
+        for (day, item), qty in quantity.groupby([days, df["item"]], observed=True).sum().items():
+            self._day(day)["items"][item] = int(qty)
+
+    def add_rows(self, rows):
+        for row, day in zip(rows, _day_keys(row["datetime"] for row in rows)):
+            if day is None:
+                continue
+            digest = self._day(day)
+            digest["calories"] += float(row["calories"])
+            digest["entries"] += 1
+            digest["meals"][row["meal"]] += float(row["calories"])
+            digest["categories"][row["category"]] += 1
+            digest["items"][row["item"]] += int(row["quantity"])
+
+    def latest_day(self):
+        return max(self.days, default=None)
+
+    def day_line(self, day, max_items=8):
+        digest = self.days[day]
+        meals = ", ".join(f"{k}={v:.0f}" for k, v in sorted(digest["meals"].items()))
+        cats = ", ".join(f"{k}={v}" for k, v in sorted(digest["categories"].items()))
+        items = sorted(digest["items"].items(), key=lambda kv: (-kv[1], kv[0]))
+        item_txt = ", ".join(f"{qty}x {item}" for item, qty in items[:max_items])
+        if len(items) > max_items:
+            item_txt += f", +{len(items) - max_items} more"
+        return f"- {day}: {digest['calories']:.0f} kcal over {digest['entries']} items | meals: {meals} | mix: {cats} | items: {item_txt}"
+
+    def rollup_line(self, days):
+        if not days:
+            return ""
+        calories = sum(self.days[d]["calories"] for d in days)
+        cats = defaultdict(int)
+        for d in days:
+            for cat, count in self.days[d]["categories"].items():
+                cats[cat] += count
+        total = sum(cats.values()) or 1
+        mix = ", ".join(f"{cat}={count / total:.0%}" for cat, count in sorted(cats.items(), key=lambda kv: (-kv[1], kv[0])))
+        return f"- Earlier {len(days)} days ({min(days)} to {max(days)}): avg {calories / len(days):.0f} kcal/day, junk entries {cats.get('junk', 0)}, mix: {mix}"
+
+    def context(self, window_days=7, token_budget=600):
+        # Newest days in full detail while they fit the budget, older days rolled up
+        ordered = sorted(self.days, reverse=True)
+        detailed = []
+        used = 0
+        for day in ordered[:window_days]:
+            line = self.day_line(day)
+            if detailed and used + estimate_tokens(line) > token_budget:
+                break
+            detailed.append(line)
+            used += estimate_tokens(line)
+        rollup = self.rollup_line(ordered[len(detailed):])
+        return "\n".join(detailed + ([rollup] if rollup else []))
+
+
+def has_id(values):
+    return (values.notna() & values.astype(str).str.strip().ne("")).to_numpy(dtype=bool)
+
+
+class SessionKeyIndex:
+    # Hash set of (start time, type) keys for imported sessions. Timestamps are
+    # normalised first, so "2025-07-20 06:00" and "2025-07-20T06:00:00" collide.
+    # Day-only rows also block sessions of the same type that day: values written
+    # with no time part, and the local midnight they load as, unless the row has a
+    # session id (id_col) and so a real start time, even at 00:00.
+    def __init__(self, date_col="date", type_col="type", id_col=None):
+        self.date_col = date_col
+        self.type_col = type_col
+        self.id_col = id_col
+        self.exact = set()
+        self.days = set()
+
+    def keys(self, dates, types, timed=None):
+        dates = pd.Series(dates)
+        ts = parse_timestamps(dates)
+        types = pd.Series(types).astype(str).to_numpy()
+        # A loaded frame is already datetime64: only its midnight is left to go on
+        written = np.zeros(len(dates), dtype=bool) if pd.api.types.is_datetime64_any_dtype(dates) else dates.map(is_date_only).to_numpy(dtype=bool)
+        midnight = (ts == ts.dt.normalize()).to_numpy()
+        timed = np.zeros(len(dates), dtype=bool) if timed is None else np.asarray(timed, dtype=bool)
+        day_only = written | (midnight & ~timed)
+        return ts.to_numpy(dtype="datetime64[ns]").view("int64"), ts.dt.date.to_numpy(), types, day_only
+
+    def rebuild(self, df):
+        self.exact, self.days = set(), set()
+        if not df.empty:
+            timed = has_id(df[self.id_col]) if self.id_col in df.columns else None
+            self._add(df[self.date_col], df[self.type_col], timed)
+
+    def add_rows(self, rows):
+        timed = has_id(pd.Series([row.get(self.id_col) for row in rows], dtype=object)) if self.id_col else None
+        self._add([row[self.date_col] for row in rows], [row[self.type_col] for row in rows], timed)
+
+    def _add(self, dates, types, timed=None):
+        ts, days, types, day_only = self.keys(dates, types, timed)
+        self.exact.update(zip(ts, types))
+        self.days.update(zip(days[day_only], types[day_only]))
+
+    def is_new(self, dates, types):
+        # Boolean mask: rows not already logged and not repeated earlier in the batch
+        ts, days, types, _ = self.keys(dates, types)
+        known = np.fromiter(((t, a) in self.exact or (d, a) in self.days for t, d, a in zip(ts, days, types)), dtype=bool, count=len(types))
+        repeated = pd.MultiIndex.from_arrays([ts, types]).duplicated()
+        return ~known & ~repeated & ~pd.isna(days)
+
+
+class TransactionHashIndex:
+    # Multiset of content hashes (day, type, amount in paise, note) of finance
+    # rows, so re-importing an overlapping bank statement only adds what is new.
+    # Counts rather than a set: two identical coffees on one day are two rows.
+    def __init__(self):
+        self.counts = Counter()
+
+    def hashes(self, dates, types, amounts, notes):
+        column = lambda values: values.reset_index(drop=True) if isinstance(values, pd.Series) else pd.Series(list(values))
+        key = pd.DataFrame({
+            "day": parse_timestamps(column(dates)).dt.strftime("%Y-%m-%d"),
+            "type": column(types).astype("string").str.lower(),
+            "paise": (pd.to_numeric(column(amounts), errors="coerce") * 100).round(),
+            "note": column(notes).astype("string").fillna("").str.lower().str.split().str.join(" ")
+        })
+        return pd.util.hash_pandas_object(key, index=False).to_numpy()
+
+    def rebuild(self, df):
+        self.counts = Counter()
+        if not df.empty:
+            self.counts.update(self.hashes(df["date"], df["type"], df["amount"], df["note"]).tolist())
+
+    def add_rows(self, rows):
+        self.counts.update(self.hashes(*zip(*((r["date"], r["type"], r["amount"], r.get("note")) for r in rows))).tolist())
+
+    def is_new(self, hashes, seen):
+        # Boolean mask: the k-th copy of a transaction in the file is new once the
+        # log held fewer than k copies before the import began. seen carries
+        # {hash: (copies logged before, copies met so far)} across chunks.
+        mask = np.empty(len(hashes), dtype=bool)
+        for i, h in enumerate(hashes.tolist()):
+            known, met = seen.get(h) or (self.counts.get(h, 0), 0)
+            mask[i] = met >= known
+            seen[h] = (known, met + 1)
+        return mask
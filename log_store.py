@@ -0,0 +1,694 @@
+import os
+import io
+import atexit
+import csv
+import glob
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
+import numpy as np
+import pandas as pd
+from log_index import DateIndex
+from timestamps import format_timestamps, is_canonical, parse_timestamps, to_timestamp
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# 🗂️ Log schemas shared by every backend
+# dtypes is the in-memory layout: low-cardinality text as categoricals, numbers
+# narrowed to what they hold (money stays float64), ids as strings. Dates in
+# parse_dates load as datetime64 once, so readers never re-parse them.
+LOG_SCHEMAS = {
+    "finance": {
+        "columns": ["date", "type", "amount", "category", "note"],
+        "date_col": "date",
+        "parse_dates": ["date"],
+        "numeric": ["amount"],
+        "dtypes": {"type": "category", "amount": "float64", "category": "category"}
+    },
+    "food": {
+        "columns": ["datetime", "meal", "item", "quantity", "calories", "category"],
+        "date_col": "datetime",
+        "parse_dates": ["datetime"],
+        "numeric": ["quantity", "calories"],
+        "dtypes": {"meal": "category", "item": "category", "quantity": "Int16", "calories": "float32", "category": "category"}
+    },
+    "sleep": {
+        "columns": ["date", "sleep_time", "wake_time", "screen_before_bed", "wake_fresh", "hours", "mood"],
+        "date_col": "date",
+        "parse_dates": ["date"],
+        "numeric": ["screen_before_bed", "hours"],
+        "dtypes": {"screen_before_bed": "Int16", "wake_fresh": "category", "hours": "float32", "mood": "category"}
+    },
+    "exercise": {
+        # session_id: the Google Fit session a row was synced from (empty for manual rows)
+        "columns": ["date", "type", "duration", "intensity", "est_calories", "heart_rate", "steps", "notes", "session_id"],
+        "date_col": "date",
+        "parse_dates": ["date"],
+        "numeric": ["duration", "est_calories", "heart_rate", "steps"],
+        "dtypes": {"type": "category", "duration": "float32", "intensity": "category", "est_calories": "float32", "heart_rate": "Int16", "steps": "Int32", "session_id": "string"}
+    }
+}
+
+EXERCISE_COLUMNS = LOG_SCHEMAS["exercise"]["columns"]
+
+# ⏳ Appends are batched by a background writer; 0 writes on the caller's thread
+FLUSH_LATENCY = float(os.environ.get("LIFESYNC_FLUSH_MS", 100)) / 1000
+
+
+def to_date_key(value):
+    if isinstance(value, datetime):
+        return to_timestamp(value)
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    return value
+
+
+def frame_records(df):
+    # DataFrame -> row dicts of plain Python values, several times faster than to_dict("records")
+    columns = list(df.columns)
+    return [dict(zip(columns, values)) for values in zip(*(df[col].tolist() for col in columns))]
+
+
+class FileLock:
+    # Exclusive lock on a sidecar file, held by one process at a time. Re-entrant
+    # for its owner; callers serialise their own threads (LogStore holds its mutex).
+    def __init__(self, path):
+        self.path = path
+        self._handle = None
+        self._depth = 0
+
+    def __enter__(self):
+        if self._depth == 0:
+            self._handle = open(self.path, "a+b")
+            if fcntl:
+                fcntl.flock(self._handle.fileno(), fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        self._handle.seek(0)
+                        msvcrt.locking(self._handle.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl:
+                fcntl.flock(self._handle.fileno(), fcntl.LOCK_UN)
+            else:
+                self._handle.seek(0)
+                msvcrt.locking(self._handle.fileno(), msvcrt.LK_UNLCK, 1)
+            self._handle.close()
+            self._handle = None
+
+
+class LogStore:
+    # Base class: keeps the loaded frame plus a tail of rows appended since the
+    # last fold, so a burst of writes costs one concat on the next read.
+    #
+    # Safe to share between threads and processes: every read and write holds the
+    # store's mutex, writes also hold a cross-process file lock, and rows that other
+    # processes appended are picked up incrementally (signature check) before each
+    # read or write. Published frames are never modified in place: a fold builds a
+    # new frame, so a reader keeps a consistent snapshot for as long as it holds one.
+    indexed = False
+
+    def __init__(self, name, columns, date_col, parse_dates=None, numeric=None, dtypes=None, compact_every=5000):
+        self.name = name
+        self.columns = list(columns)
+        self.date_col = date_col
+        self.parse_dates = parse_dates or []
+        self.numeric = numeric or []
+        self.dtypes = dtypes or {}
+        self.categorical = [col for col, dtype in self.dtypes.items() if dtype == "category"]
+        self.text = [col for col, dtype in self.dtypes.items() if dtype == "string"]
+        self.compact_every = compact_every
+        self._base = None
+        self._tail = []
+        self._appended = 0
+        self._listeners = []
+        self._pending = []  # appended in memory, not yet on disk
+        self._batching = 0  # open batch() blocks; compaction waits for the last one
+        self.write_error = None
+        self._signature_seen = None
+        self._mutex = threading.RLock()
+        self.version = 0  # bumped on every load/append/reset; callers key caches on it
+        self.date_index = self.add_listener(DateIndex(date_col))
+
+    def add_listener(self, listener):
+        # listener.rebuild(df) runs on load/reset, listener.add_rows(rows) on append
+        with self._mutex:
+            self._listeners.append(listener)
+            if self._base is not None:
+                listener.rebuild(self.frame())
+        return listener
+
+    def _empty(self):
+        return self._parse(pd.DataFrame(columns=self.columns))
+
+    def _parse(self, df):
+        for col in self.parse_dates:
+            if col in df.columns:
+                df[col] = parse_timestamps(df[col])
+        for col, dtype in self.dtypes.items():
+            if col not in df.columns or df[col].dtype == dtype:
+                continue
+            if dtype == "category":
+                df[col] = df[col].astype("category")
+            elif dtype == "string":
+                df[col] = df[col].astype("string")
+            else:
+                values = pd.to_numeric(df[col], errors="coerce")
+                if dtype.startswith("Int"):
+                    # A value the column can't hold (a typo, a hand edit) loads as missing
+                    # instead of making the whole log unreadable
+                    bounds = np.iinfo(dtype.lower())
+                    values = values.round().where(values.between(bounds.min, bounds.max))
+                df[col] = values.astype(dtype)
+        return df
+
+    def _to_disk(self, df):
+        # Text backends store dates in the canonical timestamp format
+        df = df.reindex(columns=self.columns)
+        for col in self.parse_dates:
+            df[col] = format_timestamps(df[col])
+        return df
+
+    def _canonical(self, rows):
+        for col in self.parse_dates:
+            if not all(is_canonical(row.get(col)) for row in rows):
+                stamps = format_timestamps([row.get(col) for row in rows])
+                rows = [dict(row, **{col: stamp}) for row, stamp in zip(rows, stamps)]
+        return rows
+
+    def _concat(self, base, new_rows):
+        # Categoricals only survive concat when both sides share one category set
+        for col in self.categorical:
+            if col not in base.columns:
+                continue
+            categories = base[col].cat.categories.union(new_rows[col].cat.categories)
+            if not categories.equals(base[col].cat.categories):
+                base = base.assign(**{col: base[col].cat.set_categories(categories)})
+            new_rows[col] = new_rows[col].cat.set_categories(categories)
+        return pd.concat([base, new_rows], ignore_index=True)
+
+    def load(self):
+        with self._mutex, self.lock:
+            # Logs written before a column was added load with it empty
+            self._base = self._parse(self._read_all().reindex(columns=self.columns)) if self.exists() else self._empty()
+            self._tail = []
+            self._signature_seen = self._signature()
+            self.version += 1
+            for listener in self._listeners:
+                listener.rebuild(self._base)
+            if self._pending:
+                self._absorb(list(self._pending))
+            return self._base
+
+    def _absorb(self, rows):
+        # Memory and views only: rows already on disk, or still queued for it
+        self._tail.extend(rows)
+        self.version += 1
+        for listener in self._listeners:
+            listener.add_rows(rows)
+
+    def refresh(self):
+        # Catch up with writes made by other processes since we last looked
+        with self._mutex:
+            if self._base is None:
+                return self.load()
+            if self._signature() == self._signature_seen:
+                return self._base
+            with self.lock:
+                signature = self._signature()
+                new_rows = self._read_new(self._signature_seen) if self._signature_seen is not None else None
+                if new_rows is None:
+                    return self.load()
+                if len(new_rows):
+                    self._absorb(new_rows.to_dict("records"))
+                self._signature_seen = signature
+            return self._base
+
+    def frame(self):
+        with self._mutex:
+            self.refresh()
+            if self._tail:
+                new_rows = self._parse(pd.DataFrame(self._tail, columns=self.columns))
+                if self._base.empty:
+                    self._base = new_rows
+                else:
+                    self._base = self._concat(self._base, new_rows)
+                self._tail = []
+            return self._base
+
+    def append(self, rows):
+        if isinstance(rows, dict):
+            rows = [rows]
+        elif isinstance(rows, pd.DataFrame):
+            rows = frame_records(rows)
+        if not rows:
+            return 0
+        rows = self._canonical(rows)
+        # Visible to readers at once; the disk write is queued for the writer thread
+        with self._mutex:
+            self.refresh()
+            self._absorb(rows)
+            self._pending.extend(rows)
+        if FLUSH_LATENCY > 0:
+            get_writer().submit(self)
+        else:
+            self.flush()
+        return len(rows)
+
+    def flush(self):
+        # Write queued rows now; raises if the write fails (rows stay queued)
+        with self._mutex:
+            if not self._pending:
+                return 0
+            with self.lock:
+                self.refresh()
+                rows = self._pending
+                self._write_rows(rows)
+                self._pending = []
+                self.write_error = None
+                self._signature_seen = self._signature()
+                self._appended += len(rows)
+                if self._needs_compact():
+                    self.compact()
+            return len(rows)
+
+    def _needs_compact(self):
+        return self.compact_every and self._appended >= self.compact_every and not self._batching
+
+    @contextmanager
+    def batch(self):
+        # Bulk imports: chunks are appended as usual, but the log is compacted
+        # once at the end instead of after every compact_every rows
+        with self._mutex:
+            self._batching += 1
+        try:
+            yield self
+        finally:
+            with self._mutex:
+                self._batching -= 1
+                self.flush()
+                if self._needs_compact():
+                    self.compact()
+
+    def query(self, start=None, end=None):
+        # Rows whose date falls in [start, end); either bound may be None.
+        # Once the frame is loaded the in-memory date index answers directly,
+        # otherwise indexed backends push the predicate down to disk.
+        with self._mutex:
+            if self._base is None and self.indexed:
+                return self._parse(self._read_range(start, end))
+            df = self.frame()
+            return df.iloc[self.date_index.positions(start, end)]
+
+    def compact(self):
+        with self._mutex, self.lock:
+            df = self.frame()
+            self._rewrite(df)
+            self._pending = []  # the snapshot already holds them
+            self._signature_seen = self._signature()
+            self._appended = 0
+            return len(df)
+
+    def reset(self):
+        with self._mutex, self.lock:
+            self._base = self._empty()
+            self._tail = []
+            self._pending = []
+            self._appended = 0
+            self.version += 1
+            self._drop()
+            self._signature_seen = self._signature()
+            for listener in self._listeners:
+                listener.rebuild(self._base)
+
+
+class LogWriter:
+    # Single background thread that owns disk appends. Stores with queued rows are
+    # flushed after at most `latency` seconds, so a burst of appends to one log
+    # becomes one write; flush() drains everything on the caller's thread.
+    def __init__(self, latency=None):
+        self.latency = FLUSH_LATENCY if latency is None else latency
+        self.pid = os.getpid()
+        self._dirty = {}
+        self._cond = threading.Condition()
+        self._drain_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, store):
+        with self._cond:
+            self._dirty[id(store)] = store
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._dirty:
+                    self._cond.wait()
+            time.sleep(self.latency)
+            self._drain(raise_errors=False)
+
+    def _drain(self, raise_errors=True):
+        with self._drain_lock:
+            with self._cond:
+                stores = list(self._dirty.values())
+                self._dirty.clear()
+            for store in stores:
+                try:
+                    store.flush()
+                except Exception as e:
+                    # Rows stay queued on the store and are retried on the next pass
+                    if store.write_error is None:
+                        print(f"⚠️ Could not write {store.name} log: {e}")
+                    store.write_error = e
+                    self.submit(store)
+                    if raise_errors:
+                        raise
+
+    def flush(self):
+        self._drain()
+
+
+writer = None
+writer_lock = threading.Lock()
+
+
+def get_writer():
+    global writer
+    with writer_lock:
+        if writer is None or writer.pid != os.getpid():
+            writer = LogWriter()
+        return writer
+
+
+@atexit.register
+def flush():
+    # Everything appended so far is on disk when this returns
+    if writer is not None and writer.pid == os.getpid():
+        writer.flush()
+
+
+class CsvLogStore(LogStore):
+    # Append-only CSV journal: new rows go to the end of the file and compact()
+    # rewrites a clean snapshot (fixed column order, no torn trailing line).
+    def __init__(self, path, columns, date_col, **kwargs):
+        super().__init__(os.path.splitext(os.path.basename(path))[0], columns, date_col, **kwargs)
+        self.path = path
+        self.lock = FileLock(f"{path}.lock")
+        # Bumped by every rewrite/reset: a replaced file can reuse the old inode
+        self.generation_path = f"{path}.gen"
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def _read_all(self):
+        return pd.read_csv(self.path, dtype={col: str for col in self.text})
+
+    def _generation(self):
+        try:
+            with open(self.generation_path, encoding="utf-8") as f:
+                return int(f.read() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _bump_generation(self):
+        generation = self._generation() + 1
+        with open(self.generation_path, "w", encoding="utf-8") as f:
+            f.write(str(generation))
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (self._generation(), st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _read_new(self, seen):
+        # Same file grown past what we read: parse only the appended bytes
+        current = self._signature()
+        if current is None or current[:2] != seen[:2] or current[2] < seen[2] or seen[2] == 0:
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(seen[2])
+            chunk = f.read()
+        if not chunk.strip():
+            return self._empty()
+        return pd.read_csv(io.BytesIO(chunk), header=None, names=self.columns, dtype={col: str for col in self.text})
+
+    def _file_header(self):
+        with open(self.path, newline="", encoding="utf-8") as f:
+            return next(csv.reader(f), None)
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _write_rows(self, rows):
+        new_file = not self.exists() or os.path.getsize(self.path) == 0
+        if not new_file and self._file_header() != self.columns:
+            # Legacy file with a different layout: normalise it once before appending
+            self._rewrite(pd.read_csv(self.path))
+        with open(self.path, "a", newline="", encoding="utf-8") as f:
+            if not new_file and not self._ends_with_newline():
+                f.write("\n")
+            pd.DataFrame(rows, columns=self.columns).to_csv(f, header=new_file, index=False)
+
+    def _rewrite(self, df):
+        tmp_path = f"{self.path}.tmp"
+        self._to_disk(df).to_csv(tmp_path, index=False)
+        self._bump_generation()
+        os.replace(tmp_path, self.path)
+
+    def _drop(self):
+        if self.exists():
+            self._bump_generation()
+            os.remove(self.path)
+
+
+class SqliteLogStore(LogStore):
+    # One table per log in a shared database file, with an index on the date
+    # column so query() only touches the rows in range.
+    indexed = True
+
+    def __init__(self, db_path, name, columns, date_col, **kwargs):
+        super().__init__(name, columns, date_col, **kwargs)
+        self.db_path = db_path
+        self.compact_every = 0
+        self.lock = FileLock(f"{db_path}.{name}.lock")
+        with self._connect() as conn:
+            cols = ", ".join(f'"{c}"' for c in self.columns)
+            conn.execute(f'CREATE TABLE IF NOT EXISTS "{self.name}" ({cols})')
+            # Tables created before a column was added get it, empty
+            existing = {row[1] for row in conn.execute(f'PRAGMA table_info("{self.name}")')}
+            for col in self.columns:
+                if col not in existing:
+                    conn.execute(f'ALTER TABLE "{self.name}" ADD COLUMN "{col}"')
+            conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{self.name}_{self.date_col}" ON "{self.name}" ("{self.date_col}")')
+            # Bumped by every rewrite/reset, so readers can tell appends from replacements
+            conn.execute('CREATE TABLE IF NOT EXISTS "_generations" (name TEXT PRIMARY KEY, generation INTEGER)')
+            conn.execute('INSERT OR IGNORE INTO "_generations" (name, generation) VALUES (?, 0)', (self.name,))
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def exists(self):
+        with self._connect() as conn:
+            return conn.execute(f'SELECT 1 FROM "{self.name}" LIMIT 1').fetchone() is not None
+
+    def _read_all(self):
+        with self._connect() as conn:
+            return pd.read_sql_query(f'SELECT * FROM "{self.name}" ORDER BY rowid', conn)
+
+    def _signature(self):
+        with self._connect() as conn:
+            generation = conn.execute('SELECT generation FROM "_generations" WHERE name = ?', (self.name,)).fetchone()[0]
+            last, count = conn.execute(f'SELECT MAX(rowid), COUNT(*) FROM "{self.name}"').fetchone()
+        return (generation, last or 0, count)
+
+    def _read_new(self, seen):
+        current = self._signature()
+        if current[0] != seen[0] or current[2] - seen[2] != current[1] - seen[1]:
+            return None
+        with self._connect() as conn:
+            return pd.read_sql_query(f'SELECT * FROM "{self.name}" WHERE rowid > ? ORDER BY rowid', conn, params=(seen[1],))
+
+    def _bump_generation(self, conn):
+        conn.execute('UPDATE "_generations" SET generation = generation + 1 WHERE name = ?', (self.name,))
+
+    def _read_range(self, start, end):
+        # Stored text sorts by the writer's wall time, which can be up to 26 hours off
+        # local time (-12:00 vs +14:00): the index narrows the read to the range plus
+        # two days either side, and the local days are picked after parsing
+        start = pd.Timestamp(start).date() if start is not None else None
+        end = pd.Timestamp(end).date() if end is not None else None
+        clauses, params = [], []
+        if start is not None:
+            clauses.append(f'"{self.date_col}" >= ?')
+            params.append((start - timedelta(days=2)).isoformat())
+        if end is not None:
+            clauses.append(f'"{self.date_col}" < ?')
+            params.append((end + timedelta(days=3)).isoformat())
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            df = pd.read_sql_query(f'SELECT * FROM "{self.name}"{where} ORDER BY rowid', conn, params=params)
+        days = parse_timestamps(df[self.date_col]).dt.date
+        keep = pd.Series(True, index=df.index)
+        if start is not None:
+            keep &= days >= start
+        if end is not None:
+            keep &= days < end
+        return df[keep.fillna(False).to_numpy(dtype=bool)].reset_index(drop=True)
+
+    def _values(self, rows):
+        return [tuple(to_date_key(row.get(c)) if not pd.isna(row.get(c)) else None for c in self.columns) for row in rows]
+
+    def _write_rows(self, rows):
+        cols = ", ".join(f'"{c}"' for c in self.columns)
+        marks = ", ".join("?" for _ in self.columns)
+        with self._connect() as conn:
+            conn.executemany(f'INSERT INTO "{self.name}" ({cols}) VALUES ({marks})', self._values(rows))
+
+    def _rewrite(self, df):
+        rows = self._to_disk(df).to_dict("records")
+        with self._connect() as conn:
+            conn.execute(f'DELETE FROM "{self.name}"')
+            self._bump_generation(conn)
+            cols = ", ".join(f'"{c}"' for c in self.columns)
+            marks = ", ".join("?" for _ in self.columns)
+            conn.executemany(f'INSERT INTO "{self.name}" ({cols}) VALUES ({marks})', self._values(rows))
+
+    def _drop(self):
+        with self._connect() as conn:
+            conn.execute(f'DELETE FROM "{self.name}"')
+            self._bump_generation(conn)
+
+
+class ParquetLogStore(LogStore):
+    # Columnar store: each append writes a small part file into the log's
+    # directory and compact() merges the parts into one. Date-range queries
+    # are pushed down to pyarrow so row groups outside the range are skipped.
+    indexed = True
+
+    def __init__(self, directory, name, columns, date_col, compact_parts=64, **kwargs):
+        super().__init__(name, columns, date_col, **kwargs)
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("pyarrow is required for the parquet log store. Install it with 'pip install pyarrow'.")
+        self.directory = directory
+        self.compact_every = 0
+        self.compact_parts = compact_parts
+        os.makedirs(self.directory, exist_ok=True)
+        self.lock = FileLock(os.path.join(self.directory, ".lock"))
+
+    def _parts(self):
+        return sorted(glob.glob(os.path.join(self.directory, "part-*.parquet")))
+
+    def exists(self):
+        return bool(self._parts())
+
+    def _signature(self):
+        return tuple(self._parts())
+
+    def _read_new(self, seen):
+        # Only new part files since we last looked (compaction replaces old ones)
+        parts = self._parts()
+        if not set(seen) <= set(parts):
+            return None
+        new_parts = [p for p in parts if p not in set(seen)]
+        if not new_parts:
+            return self._empty()
+        return self._read_parts(new_parts)
+
+    def _read_parts(self, parts, filters=None):
+        # Parts written before a column was added lack it: read them all under one schema
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        schema = pa.unify_schemas([pq.read_schema(part) for part in parts])
+        return pd.read_parquet(parts, schema=schema, filters=filters).reindex(columns=self.columns)
+
+    def _typed(self, df):
+        df = df.reindex(columns=self.columns)
+        for col in self.columns:
+            if col == self.date_col:
+                df[col] = parse_timestamps(df[col])
+            elif col in self.numeric:
+                df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+            else:
+                df[col] = df[col].astype("string")
+        return df
+
+    def _read_all(self):
+        return self._read_parts(self._parts())
+
+    def _read_range(self, start, end):
+        if not self.exists():
+            return self._empty()
+        filters = []
+        if start is not None:
+            filters.append((self.date_col, ">=", pd.Timestamp(start)))
+        if end is not None:
+            filters.append((self.date_col, "<", pd.Timestamp(end)))
+        return self._read_parts(self._parts(), filters or None)
+
+    def _write_part(self, df):
+        path = os.path.join(self.directory, f"part-{time.time_ns():020d}.parquet")
+        self._typed(df).to_parquet(path, index=False)
+
+    def _write_rows(self, rows):
+        self._write_part(pd.DataFrame(rows, columns=self.columns))
+
+    def _needs_compact(self):
+        return len(self._parts()) >= self.compact_parts
+
+    def _rewrite(self, df):
+        old_parts = self._parts()
+        self._write_part(df)
+        for path in old_parts:
+            os.remove(path)
+
+    def _drop(self):
+        for path in self._parts():
+            os.remove(path)
+
+
+def open_store(name, backend="csv", data_dir=".", seed_csv=True):
+    schema = LOG_SCHEMAS[name]
+    kwargs = {"parse_dates": schema["parse_dates"], "numeric": schema["numeric"], "dtypes": schema["dtypes"]}
+    csv_path = os.path.join(data_dir, f"{name}_log.csv")
+    if backend == "csv":
+        return CsvLogStore(csv_path, schema["columns"], schema["date_col"], **kwargs)
+    if backend == "sqlite":
+        store = SqliteLogStore(os.path.join(data_dir, "lifesync.db"), name, schema["columns"], schema["date_col"], **kwargs)
+    elif backend == "parquet":
+        store = ParquetLogStore(os.path.join(data_dir, f"{name}_log.parquet"), name, schema["columns"], schema["date_col"], **kwargs)
+    else:
+        raise ValueError(f"Unknown log store backend '{backend}'. Use 'csv', 'sqlite' or 'parquet'.")
+    if seed_csv and not store.exists() and os.path.exists(csv_path):
+        # One-time import when switching an existing install to an indexed backend
+        store.append(pd.read_csv(csv_path).to_dict("records"))
+    return store
@@ -0,0 +1,87 @@
+import argparse
+import os
+import shutil
+import pandas as pd
+from log_store import LOG_SCHEMAS, open_store
+from timestamps import LOCAL_TZ, is_canonical, parse_timestamps
+
+# 🕒 One-time rewrite of existing logs into the canonical timestamp format
+# Older rows hold "%Y-%m-%d %H:%M" / "%Y-%m-%d" local wall times, except Google
+# Fit imports, which were written in UTC; both are converted to ISO-8601 with the
+# local offset. Date-only values stay on their calendar day (local midnight).
+# The original files are kept next to the new ones as .bak.
+#
+#   python migrate_timestamps.py --dry-run
+#   python migrate_timestamps.py --backend sqlite --data-dir data
+
+FIT_NOTE = "Imported from Google Fit"
+
+
+def backup(store, done):
+    source = getattr(store, "path", None) or getattr(store, "db_path", None) or store.directory
+    if source in done:
+        return
+    if os.path.isdir(source):
+        shutil.copytree(source, f"{source}.bak", dirs_exist_ok=True)
+    else:
+        shutil.copy2(source, f"{source}.bak")
+    done.add(source)
+
+
+def migrate_store(store, dry_run=False, backed_up=None):
+    with store._mutex, store.lock:
+        if not store.exists():
+            return None
+        raw = store._read_all()
+        result = {"log": store.name, "rows": len(raw), "legacy": 0, "from_utc": 0, "unparsed": 0}
+        for col in store.parse_dates:
+            values = raw[col]
+            if pd.api.types.is_datetime64_any_dtype(values):
+                values = values.dt.strftime("%Y-%m-%d %H:%M:%S")
+            values = values.astype(object)
+            legacy = values.notna() & ~values.map(is_canonical)
+            from_utc = None
+            if "notes" in raw.columns:
+                # Only Fit start times were UTC; day-only values are local calendar dates
+                has_time = values.astype(str).str.contains(r"\d:\d\d", regex=True)
+                fit = raw["notes"].astype(str).str.startswith(FIT_NOTE)
+                from_utc = (legacy & has_time & fit).to_numpy()
+                result["from_utc"] += int(from_utc.sum())
+            parsed = parse_timestamps(values, utc_mask=from_utc)
+            result["legacy"] += int(legacy.sum())
+            result["unparsed"] += int((values.notna() & parsed.isna()).sum())
+            raw[col] = parsed
+        if result["legacy"] and not dry_run:
+            backup(store, backed_up if backed_up is not None else set())
+            store._rewrite(raw)
+            store._signature_seen = None  # reload on next read
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite log timestamps into the canonical ISO-8601 format.")
+    parser.add_argument("--data-dir", default=".")
+    parser.add_argument("--backend", default=os.environ.get("LIFESYNC_STORE", "csv"))
+    parser.add_argument("--logs", nargs="+", default=list(LOG_SCHEMAS), choices=list(LOG_SCHEMAS))
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    args = parser.parse_args()
+
+    print(f"🕒 Local time zone: {LOCAL_TZ}")
+    backed_up = set()
+    for name in args.logs:
+        store = open_store(name, backend=args.backend, data_dir=args.data_dir, seed_csv=False)
+        result = migrate_store(store, args.dry_run, backed_up)
+        if result is None:
+            print(f"- {name}: no log found")
+            continue
+        action = "would convert" if args.dry_run else "converted"
+        line = f"- {name}: {result['rows']} rows, {action} {result['legacy']} timestamps ({result['from_utc']} Google Fit rows from UTC)"
+        if result["unparsed"]:
+            line += f", ⚠️ {result['unparsed']} could not be parsed and are left empty (originals in the .bak)"
+        print(line)
+    if backed_up:
+        print("💾 Originals kept as: " + ", ".join(f"{path}.bak" for path in sorted(backed_up)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import json
+import os
+import re
+from bisect import bisect_left
+import numpy as np
+import pandas as pd
+
+# 🥗 Nutrition database: the built-in foods, or a catalogue loaded from a local
+# CSV/JSON file (LIFESYNC_FOOD_DB). Items keep full macros per serving and are
+# looked up through an exact map, a sorted prefix list and a trigram index, so
+# search stays well under a millisecond with tens of thousands of items.
+#
+# CSV columns / JSON keys: name, cal, cat, protein, carbs, fat, fiber, serving
+# (calories/category are accepted for cal/cat). JSON may be a list of objects
+# or an object keyed by name.
+
+FIELDS = ["cal", "cat", "protein", "carbs", "fat", "fiber", "serving"]
+MACROS = ["cal", "protein", "carbs", "fat", "fiber"]
+ALIASES = {"calories": "cal", "category": "cat", "item": "name", "food": "name"}
+
+BUILTIN_FOODS = {
+    "roti": {"cal": 120, "cat": "carb", "protein": 3.1, "carbs": 18.0, "fat": 3.7, "fiber": 2.0, "serving": "1 piece"},
+    "rice": {"cal": 130, "cat": "carb", "protein": 2.7, "carbs": 28.0, "fat": 0.3, "fiber": 0.4, "serving": "100 g cooked"},
+    "dal": {"cal": 100, "cat": "protein", "protein": 6.8, "carbs": 16.0, "fat": 0.5, "fiber": 4.0, "serving": "1 small bowl"},
+    "chicken curry": {"cal": 180, "cat": "protein", "protein": 16.0, "carbs": 5.0, "fat": 10.5, "fiber": 1.0, "serving": "1 small bowl"},
+    "egg": {"cal": 78, "cat": "protein", "protein": 6.3, "carbs": 0.6, "fat": 5.3, "fiber": 0.0, "serving": "1 large"},
+    "banana": {"cal": 90, "cat": "carb", "protein": 1.1, "carbs": 23.0, "fat": 0.3, "fiber": 2.6, "serving": "1 medium"},
+    "apple": {"cal": 52, "cat": "fiber", "protein": 0.3, "carbs": 14.0, "fat": 0.2, "fiber": 2.4, "serving": "100 g"},
+    "milk": {"cal": 103, "cat": "protein", "protein": 8.0, "carbs": 12.0, "fat": 2.4, "fiber": 0.0, "serving": "1 cup"},
+    "bread": {"cal": 66, "cat": "carb", "protein": 2.3, "carbs": 12.3, "fat": 0.9, "fiber": 0.7, "serving": "1 slice"},
+    "butter": {"cal": 102, "cat": "fat", "protein": 0.1, "carbs": 0.0, "fat": 11.5, "fiber": 0.0, "serving": "1 tbsp"},
+    "maggi": {"cal": 205, "cat": "junk", "protein": 4.5, "carbs": 27.0, "fat": 8.8, "fiber": 1.0, "serving": "1 pack"},
+    "pizza slice": {"cal": 285, "cat": "junk", "protein": 12.0, "carbs": 36.0, "fat": 10.4, "fiber": 2.5, "serving": "1 slice"},
+    "burger": {"cal": 295, "cat": "junk", "protein": 17.0, "carbs": 30.0, "fat": 12.0, "fiber": 1.5, "serving": "1 burger"},
+    "chips": {"cal": 150, "cat": "junk", "protein": 2.0, "carbs": 15.0, "fat": 10.0, "fiber": 1.2, "serving": "28 g"},
+    "coffee": {"cal": 40, "cat": "fat", "protein": 1.0, "carbs": 6.0, "fat": 1.3, "fiber": 0.0, "serving": "1 cup with milk"},
+    "tea": {"cal": 30, "cat": "fat", "protein": 0.8, "carbs": 5.0, "fat": 0.7, "fiber": 0.0, "serving": "1 cup with milk"},
+    "salad": {"cal": 60, "cat": "fiber", "protein": 2.0, "carbs": 10.0, "fat": 1.5, "fiber": 3.0, "serving": "1 bowl"},
+    "paneer": {"cal": 265, "cat": "protein", "protein": 18.0, "carbs": 3.5, "fat": 20.0, "fiber": 0.0, "serving": "100 g"},
+    "oats": {"cal": 68, "cat": "carb", "protein": 2.4, "carbs": 12.0, "fat": 1.4, "fiber": 1.7, "serving": "100 g cooked"},
+    "spinach": {"cal": 30, "cat": "fiber", "protein": 3.0, "carbs": 3.6, "fat": 0.4, "fiber": 2.2, "serving": "1 cup cooked"},
+    "green beans": {"cal": 40, "cat": "fiber", "protein": 2.4, "carbs": 7.0, "fat": 0.1, "fiber": 3.4, "serving": "1 cup"},
+    "curd": {"cal": 60, "cat": "protein", "protein": 3.5, "carbs": 4.7, "fat": 3.3, "fiber": 0.0, "serving": "100 g"}
+}
+
+
+def number(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if value != value else value
+
+
+def text_field(value, default=""):
+    return default if value is None or (isinstance(value, float) and value != value) else str(value).strip()
+
+
+def normalize(text):
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", str(text).lower()).split())
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FoodDatabase:
+    # Mapping-style access (food_db["rice"]["cal"], "rice" in food_db, list(food_db))
+    # over column arrays; the search indexes are built on the first search
+    def __init__(self, items=None):
+        self.names = []
+        self.ids = {}
+        self.columns = {field: [] for field in FIELDS}
+        self._index = None
+        if items:
+            self.add(items)
+
+    def add(self, items):
+        # items: {name: fields} or a list of dicts with a name; later entries win
+        if isinstance(items, dict):
+            items = [dict(fields, name=name) for name, fields in items.items()]
+        for item in items:
+            name = normalize(item.get("name", ""))
+            if not name:
+                continue
+            values = {m: number(item.get(m)) for m in MACROS}
+            values["cat"] = text_field(item.get("cat"), "other").lower() or "other"
+            values["serving"] = text_field(item.get("serving"))
+            if name in self.ids:
+                row = self.ids[name]
+                for field in FIELDS:
+                    self.columns[field][row] = values[field]
+            else:
+                self.ids[name] = len(self.names)
+                self.names.append(name)
+                for field in FIELDS:
+                    self.columns[field].append(values[field])
+        self._index = None
+        return self
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, name):
+        return normalize(name) in self.ids
+
+    def __getitem__(self, name):
+        row = self.ids[normalize(name)]
+        return {field: self.columns[field][row] for field in FIELDS}
+
+    def keys(self):
+        return list(self.names)
+
+    def get(self, name, default=None):
+        return self[name] if name in self else default
+
+    def frame(self):
+        return pd.DataFrame({"name": self.names, **self.columns})
+
+    def _build_index(self):
+        # words: (word, row) for every word of every name, sorted for prefix search
+        # grams: trigram -> rows holding it; sizes: trigram count per row
+        words = sorted((word, row) for row, name in enumerate(self.names) for word in name.split())
+        postings = {}
+        sizes = np.zeros(len(self.names), dtype=np.int32)
+        for row, name in enumerate(self.names):
+            grams = trigrams(name)
+            sizes[row] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(row)
+        grams = {gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()}
+        self._index = {"words": words, "keys": [w for w, _ in words], "grams": grams, "sizes": sizes}
+        return self._index
+
+    def _prefix_rows(self, query, limit):
+        index = self._index or self._build_index()
+        first = query.split()[0]
+        start = bisect_left(index["keys"], first)
+        rows = []
+        for word, row in index["words"][start:start + limit * 50]:
+            if not word.startswith(first) or len(rows) >= limit * 4:
+                break
+            if query in self.names[row]:
+                rows.append(row)
+        return rows
+
+    def _fuzzy_scores(self, query):
+        # Dice similarity of trigram sets, for every row sharing at least one trigram
+        index = self._index or self._build_index()
+        grams = trigrams(query)
+        hits = [index["grams"][g] for g in grams if g in index["grams"]]
+        if not hits:
+            return np.array([], dtype=np.int32), np.array([])
+        common = np.bincount(np.concatenate(hits), minlength=len(self.names))
+        rows = np.flatnonzero(common)
+        return rows, 2 * common[rows] / (len(grams) + index["sizes"][rows])
+
+    def search(self, query, limit=10, cutoff=0.3):
+        # -> [(name, score)]: exact match, then prefix/word matches (shortest first),
+        # then typo-tolerant trigram matches above cutoff
+        query = normalize(query)
+        if not query:
+            return [(name, 0.0) for name in sorted(self.names)[:limit]]
+        results = {}
+        if query in self.ids:
+            results[query] = 1.0
+        for row in sorted(self._prefix_rows(query, limit), key=lambda r: (not self.names[r].startswith(query), len(self.names[r]), self.names[r])):
+            results.setdefault(self.names[row], 0.9)
+            if len(results) >= limit:
+                return list(results.items())
+        rows, scores = self._fuzzy_scores(query)
+        keep = scores >= cutoff
+        rows, scores = rows[keep], scores[keep]
+        if len(rows) > limit:
+            top = np.argpartition(-scores, limit)[:limit]
+            rows, scores = rows[top], scores[top]
+        for row, score in sorted(zip(rows.tolist(), scores.tolist()), key=lambda rs: (-rs[1], self.names[rs[0]])):
+            results.setdefault(self.names[row], round(score, 3))
+            if len(results) >= limit:
+                break
+        return list(results.items())
+
+    def match(self, name, cutoff=0.5):
+        # Exact item, else the closest spelling (typos, plurals), else None
+        query = normalize(name)
+        if query in self.ids:
+            return query
+        if len(query) < 3:
+            return None
+        rows, scores = self._fuzzy_scores(query)
+        if not len(rows) or scores.max() < cutoff:
+            return None
+        return self.names[rows[np.argmax(scores)]]
+
+    def nutrition(self, name, qty=1):
+        item = self[name]
+        return {**{m: item[m] * qty for m in MACROS}, "cat": item["cat"], "serving": item["serving"]}
+
+
+def read_food_file(path):
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = [dict(fields, name=name) for name, fields in data.items()]
+        frame = pd.DataFrame(data)
+    else:
+        frame = pd.read_csv(path)
+    frame = frame.rename(columns=lambda c: ALIASES.get(str(c).strip().lower(), str(c).strip().lower()))
+    if "name" not in frame.columns or "cal" not in frame.columns:
+        raise ValueError(f"Food database {path} needs at least 'name' and 'cal' columns.")
+    return frame.reindex(columns=["name"] + FIELDS).to_dict("records")
+
+
+def load_food_db(path=None):
+    # Built-in foods plus the catalogue file, whose entries win on name clashes
+    db = FoodDatabase(BUILTIN_FOODS)
+    path = path or os.environ.get("LIFESYNC_FOOD_DB")
+    if path:
+        db.add(read_food_file(path))
+    return db
@@ -0,0 +1,109 @@
+import io
+import pytest
+from bank_import import DEFAULT_RULES, import_statement, read_ofx_chunks, read_statement, to_finance_rows
+from log_store import open_store
+
+# 🏦 Statements in every format map onto the finance log, and re-importing one adds nothing
+
+
+CSV_STATEMENT = """Txn Date,Narration,Withdrawal Amt.,Deposit Amt.
+03/04/2025,SWIGGY ORDER 1234,250.00,
+03/04/2025,SWIGGY ORDER 1234,250.00,
+05/04/2025,ACME PAYROLL APR,,"85,000.00"
+06/04/2025,  Corner   Shop ,99.50,
+not a date,BROKEN ROW,10.00,
+"""
+
+OFX_STATEMENT = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250409120000[+5.5:IST]<TRNAMT>-1200.00<NAME>UBER TRIP<MEMO>Airport</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20250410<TRNAMT>500.00<NAME>REFUND<MEMO>REFUND</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250411<TRNAMT>-649.00<NAME>NETFLIX</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+QIF_STATEMENT = """!Type:Bank
+D04/09/2025
+T-45.00
+PBook Nook
+MPaperbacks
+LHobbies:Books
+^
+D04/10'2025
+U1,500.00
+PClient Inc
+^
+"""
+
+
+def read(text, name, chunksize=1000):
+    raw = next(read_statement(io.StringIO(text), DEFAULT_RULES, chunksize, name))
+    rows, invalid = to_finance_rows(raw, DEFAULT_RULES, {})
+    return rows.assign(day=rows["date"].str[:10]), invalid
+
+
+def test_csv_with_debit_and_credit_columns():
+    rows, invalid = read(CSV_STATEMENT, "statement.csv")
+    assert invalid == 1
+    assert rows[["day", "type", "amount", "category", "note"]].values.tolist() == [
+        ["2025-04-03", "expense", 250.0, "food", "SWIGGY ORDER 1234"],
+        ["2025-04-03", "expense", 250.0, "food", "SWIGGY ORDER 1234"],
+        ["2025-04-05", "income", 85000.0, "salary", "ACME PAYROLL APR"],
+        ["2025-04-06", "expense", 99.5, "other", "Corner Shop"]]
+
+
+def test_csv_amount_formats_and_dr_cr_column():
+    text = "Date,Description,Amount,Dr/Cr\n2025-04-01,a,(250.00),\n2025-04-01,b,\"1,200.00 Cr\",\n2025-04-01,c,₹75,DR\n2025-04-01,d,-30,Cr\n"
+    rows, _ = read(text, "statement.csv")
+    assert list(zip(rows["note"], rows["type"], rows["amount"])) == [
+        ("a", "expense", 250.0), ("b", "income", 1200.0), ("c", "expense", 75.0), ("d", "income", 30.0)]
+
+
+def test_csv_without_amount_columns_is_rejected():
+    with pytest.raises(ValueError, match="date and amount"):
+        read("Date,Description\n2025-04-01,a\n", "statement.csv")
+
+
+def test_ofx_transactions():
+    rows, invalid = read(OFX_STATEMENT, "export.ofx")
+    assert invalid == 0
+    assert rows[["day", "type", "amount", "category", "note"]].values.tolist() == [
+        ["2025-04-09", "expense", 1200.0, "travel", "UBER TRIP Airport"],
+        ["2025-04-10", "income", 500.0, "income", "REFUND"],
+        ["2025-04-11", "expense", 649.0, "fun", "NETFLIX"]]
+
+
+def test_ofx_tags_split_across_reads_and_chunks():
+    chunks = list(read_ofx_chunks(io.StringIO(OFX_STATEMENT), chunksize=2, block=16))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert chunks[0]["description"].tolist() == ["UBER TRIP Airport", "REFUND"]
+
+
+def test_qif_is_month_first_with_file_categories(tmp_path):
+    path = tmp_path / "export.qif"
+    path.write_text(QIF_STATEMENT, encoding="utf-8")
+    store = open_store("finance", data_dir=str(tmp_path), seed_csv=False)
+    report = import_statement(str(path), store)
+    assert (report["imported"], report["income"], report["expense"]) == (2, 1500.0, 45.0)
+    rows = store.frame()
+    assert rows["date"].dt.strftime("%Y-%m-%d").tolist() == ["2025-04-09", "2025-04-10"]
+    assert rows[["category", "note"]].values.tolist() == [["hobbies", "Book Nook Paperbacks"], ["income", "Client Inc"]]
+
+
+def test_reimport_skips_what_is_already_logged(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text(CSV_STATEMENT, encoding="utf-8")
+    store = open_store("finance", data_dir=str(tmp_path), seed_csv=False)
+    first = import_statement(str(path), store, chunksize=2)
+    assert (first["imported"], first["duplicates"], first["invalid"]) == (4, 0, 1)
+    store.flush()
+
+    again = open_store("finance", data_dir=str(tmp_path), seed_csv=False)
+    second = import_statement(str(path), again)
+    assert (second["imported"], second["duplicates"]) == (0, 4)
+
+    # A longer statement overlapping the first: only the new rows (and the third coffee) go in
+    path.write_text(CSV_STATEMENT + "03/04/2025,swiggy order 1234,250.00,\n07/04/2025,RENT APRIL,20000,\n", encoding="utf-8")
+    third = import_statement(str(path), again)
+    assert (third["imported"], third["duplicates"]) == (2, 4)
+    assert len(again.frame()) == 6
@@ -0,0 +1,80 @@
+import os
+from datetime import datetime
+import pandas as pd
+import google_fit
+from fake_fit import HOUR_MS, FakeFitService, synthetic_sessions
+from log_store import open_store
+from migrate_timestamps import migrate_store
+from timestamps import to_timestamp
+
+# 🔁 Re-syncing a session must not log it twice, whether or not the store was read before
+
+
+def fit_session(start="2025-07-20T06:30:00+05:30", kind="running"):
+    return pd.DataFrame([{
+        "date": start, "type": kind, "duration_minutes": 30.0,
+        "calories": 250, "steps": 4000, "name": "Morning run", "session_id": f"{kind}-{start}"
+    }])
+
+
+def write_legacy_log(tmp_path):
+    # Fit rows used to be logged as a bare day, with no session id column
+    path = os.path.join(str(tmp_path), "exercise_log.csv")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("date,type,duration,intensity,est_calories,heart_rate,steps,notes\n")
+        f.write("2025-07-20,running,30,auto,250,0,4000,Imported from Google Fit: Morning run\n")
+    return path
+
+
+def test_same_session_twice_into_fresh_store(tmp_path):
+    for _ in range(2):
+        store = open_store("exercise", data_dir=str(tmp_path), seed_csv=False)
+        google_fit.log_fit_to_exercise(store, fit_session())
+    assert len(open_store("exercise", data_dir=str(tmp_path), seed_csv=False).frame()) == 1
+
+
+def test_same_session_twice_through_path(tmp_path):
+    path = os.path.join(str(tmp_path), "exercise_log.csv")
+    assert google_fit.log_fit_to_exercise(path, fit_session())
+    assert not google_fit.log_fit_to_exercise(path, fit_session())
+    assert len(pd.read_csv(path)) == 1
+
+
+def test_late_upload_inside_overlap_is_synced_once(tmp_path):
+    store = open_store("exercise", data_dir=str(tmp_path), seed_csv=False)
+    state_path = os.path.join(str(tmp_path), "fit_sync_state.json")
+    sessions, metrics = synthetic_sessions(days=2, per_day=2)
+    log_chunk = lambda df: google_fit.log_fit_to_exercise(store, df)
+    google_fit.sync_fit_sessions(FakeFitService(sessions, metrics), log_chunk, state_path=state_path, default_hours=48)
+    # Written by the phone just after that sync, though it ended before the saved mark
+    end_ms = google_fit.load_sync_state(state_path)["last_end_ms"] - 5 * 60 * 1000
+    late = {"id": "late", "name": "Walk", "activityType": 7,
+            "startTimeMillis": str(end_ms - HOUR_MS), "endTimeMillis": str(end_ms)}
+    service = FakeFitService(sessions + [late], {**metrics, "late": metrics[sessions[0]["id"]]})
+    google_fit.sync_fit_sessions(service, log_chunk, state_path=state_path)
+    assert len(store.frame()) == len(sessions) + 1
+
+
+def test_session_at_midnight_only_blocks_itself(tmp_path):
+    midnight = to_timestamp(datetime(2025, 7, 20))
+    morning = to_timestamp(datetime(2025, 7, 20, 7))
+    for start in [midnight, morning, midnight]:
+        store = open_store("exercise", data_dir=str(tmp_path), seed_csv=False)
+        google_fit.log_fit_to_exercise(store, fit_session(start))
+    assert len(open_store("exercise", data_dir=str(tmp_path), seed_csv=False).frame()) == 2
+
+
+def test_legacy_day_only_fit_row_blocks_its_day(tmp_path):
+    write_legacy_log(tmp_path)
+    store = open_store("exercise", data_dir=str(tmp_path), seed_csv=False)
+    assert not google_fit.log_fit_to_exercise(store, fit_session(to_timestamp(datetime(2025, 7, 20, 7))))
+    assert len(store.frame()) == 1
+
+
+def test_migrated_day_only_fit_row_still_blocks_its_day(tmp_path):
+    write_legacy_log(tmp_path)
+    migrate_store(open_store("exercise", data_dir=str(tmp_path), seed_csv=False))
+    store = open_store("exercise", data_dir=str(tmp_path), seed_csv=False)
+    assert not google_fit.log_fit_to_exercise(store, fit_session(to_timestamp(datetime(2025, 7, 20, 7))))
+    assert google_fit.log_fit_to_exercise(store, fit_session(to_timestamp(datetime(2025, 7, 21, 7))))
+    assert store.frame()["session_id"].notna().sum() == 1
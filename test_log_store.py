@@ -0,0 +1,129 @@
+import os
+import subprocess
+import sys
+import pytest
+from log_index import FinanceAggregates
+from log_store import open_store
+from timestamps import to_timestamp
+
+# 🗂️ Log stores: every backend reads back what it wrote, whatever other processes did
+
+
+def test_out_of_range_value_loads_as_missing(tmp_path):
+    path = tmp_path / "food_log.csv"
+    path.write_text("datetime,meal,item,quantity,calories,category\n"
+                    "2025-07-20T13:00:00+00:00,lunch,rice,40000,5200000,carb\n"
+                    "2025-07-20T20:00:00+00:00,dinner,rice,2,260,carb\n", encoding="utf-8")
+    frame = open_store("food", data_dir=str(tmp_path), seed_csv=False).frame()
+    assert frame["quantity"].isna().tolist() == [True, False]
+    assert frame["quantity"].iloc[1] == 2
+
+
+def test_sqlite_range_follows_local_days_across_offsets(tmp_path):
+    rows = [{"datetime": when, "meal": "snack", "item": "apple", "quantity": 1, "calories": 95, "category": "fruit"}
+            for when in ("2025-07-19T23:30:00-12:00", "2025-07-20T00:30:00+14:00", "2025-07-20T12:00:00+00:00",
+                         "2025-07-20T23:30:00-05:00", "2025-07-21T01:00:00+05:30", "2025-07-22T09:00:00+00:00")]
+    store = open_store("food", backend="sqlite", data_dir=str(tmp_path), seed_csv=False)
+    store.append(rows)
+    store.flush()
+    loaded = open_store("food", backend="sqlite", data_dir=str(tmp_path), seed_csv=False)
+    loaded.frame()
+    for start, end in (("2025-07-20", "2025-07-21"), ("2025-07-21", "2025-07-22"), ("2025-07-19", None), (None, "2025-07-21")):
+        on_disk = open_store("food", backend="sqlite", data_dir=str(tmp_path), seed_csv=False).query(start, end)
+        assert on_disk["datetime"].tolist() == loaded.query(start, end)["datetime"].tolist()
+
+
+BACKENDS = ["csv", "sqlite", "parquet"]
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def open_finance(tmp_path, backend):
+    return open_store("finance", backend=backend, data_dir=str(tmp_path), seed_csv=False)
+
+
+def finance_rows(n, tag="a"):
+    return [{"date": to_timestamp(f"2025-07-{1 + i % 28:02d} 10:00"), "type": "expense" if i % 3 else "income",
+             "amount": float(i + 1), "category": f"{tag}{i % 4}", "note": f"{tag}-{i}"} for i in range(n)]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_appended_rows_read_back_after_reopening(tmp_path, backend):
+    rows = finance_rows(30)
+    store = open_finance(tmp_path, backend)
+    store.append(rows[:10])
+    store.append(rows[10:])
+    store.flush()
+    frame = open_finance(tmp_path, backend).frame()
+    assert frame["note"].tolist() == [row["note"] for row in rows]
+    assert frame["amount"].tolist() == [row["amount"] for row in rows]
+    assert frame["date"].dt.strftime("%Y-%m-%d").tolist() == [row["date"][:10] for row in rows]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_compaction_keeps_every_row(tmp_path, backend):
+    rows = finance_rows(40)
+    store = open_finance(tmp_path, backend)
+    for i in range(0, 40, 5):
+        store.append(rows[i:i + 5])
+        store.flush()
+    before = store.frame()["note"].tolist()
+    assert store.compact() == 40
+    store.append(finance_rows(5, "b"))
+    store.flush()
+    after = open_finance(tmp_path, backend).frame()["note"].tolist()
+    assert after == before + [row["note"] for row in finance_rows(5, "b")]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_appends_from_several_processes_are_all_kept(tmp_path, backend):
+    reader = open_finance(tmp_path, backend)
+    reader.frame()
+    script = ("import sys\n"
+              "from log_store import open_store\n"
+              "from test_log_store import finance_rows\n"
+              "store = open_store('finance', backend=sys.argv[1], data_dir=sys.argv[2], seed_csv=False)\n"
+              "store.compact_every = 7\n"
+              "for row in finance_rows(40, sys.argv[3]):\n"
+              "    store.append(row)\n"
+              "store.flush()\n")
+    env = {**os.environ, "PYTHONPATH": HERE}
+    workers = [subprocess.Popen([sys.executable, "-c", script, backend, str(tmp_path), tag], env=env) for tag in "pqrs"]
+    assert [w.wait(timeout=120) for w in workers] == [0, 0, 0, 0]
+    expected = sorted(row["note"] for tag in "pqrs" for row in finance_rows(40, tag))
+    assert sorted(open_finance(tmp_path, backend).frame()["note"]) == expected
+    reader.refresh()
+    assert sorted(reader.frame()["note"]) == expected
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_refresh_picks_up_another_writers_rows(tmp_path, backend):
+    store = open_finance(tmp_path, backend)
+    store.append(finance_rows(5))
+    store.flush()
+    assert len(store.frame()) == 5
+    other = open_finance(tmp_path, backend)
+    other.append(finance_rows(3, "b"))
+    other.flush()
+    store.refresh()
+    assert store.frame()["note"].tolist()[-3:] == ["b-0", "b-1", "b-2"]
+    assert len(store.query("2025-07-01", "2025-07-02")) == 2
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_views_kept_by_appends_match_a_rebuild(tmp_path, backend):
+    store = open_finance(tmp_path, backend)
+    stats = store.add_listener(FinanceAggregates())
+    store.load()
+    rows = finance_rows(60)
+    for i in range(0, 60, 7):
+        store.append(rows[i:i + 7])
+    store.append(rows[0])
+    store.flush()
+    reopened = open_finance(tmp_path, backend)
+    rebuilt = reopened.add_listener(FinanceAggregates())
+    reopened.load()
+    assert dict(stats.totals) == pytest.approx(dict(rebuilt.totals))
+    for kept, fresh in ((stats.by_category, rebuilt.by_category), (stats.by_month, rebuilt.by_month)):
+        assert {t: dict(v) for t, v in kept.items()} == {t: dict(v) for t, v in fresh.items()}
+    for start, end in (("2025-07-03", "2025-07-10"), (None, "2025-07-02"), ("2025-07-20", None)):
+        assert store.query(start, end)["note"].tolist() == reopened.query(start, end)["note"].tolist()
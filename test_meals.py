@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+import Life_final
+from Life_final import log_meal, log_meals
+
+# 🍽️ Bulk meal logging keeps the valid rows and says why the others were skipped
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("LIFESYNC_FOOD_DB", raising=False)
+    monkeypatch.setattr(Life_final, "stores", {})
+
+
+def logged():
+    return pd.read_csv("food_log.csv")
+
+
+def test_each_rejection_reason_names_its_rows():
+    message = log_meals([
+        {"item": "rice", "quantity": 2, "meal": "lunch"},
+        {"item": "xylophone", "quantity": 1, "meal": "lunch"},
+        {"item": "dal", "quantity": 0, "meal": "lunch"},
+        {"item": "dal", "quantity": 1.5, "meal": "lunch"},
+        {"item": "dal", "quantity": 1001, "meal": "lunch"},
+        {"item": "dal", "quantity": "two", "meal": "lunch"},
+        {"item": "egg", "quantity": 1, "meal": " "},
+        {"item": "egg", "quantity": 1, "meal": "breakfast", "datetime": "not a date"},
+    ])
+    assert message.startswith("✅ 1 meal item(s) logged (260 kcal). ⚠️ Skipped 7: ")
+    assert "unknown item (rows 2)" in message
+    assert "invalid quantity (rows 3, 4, 5, 6)" in message
+    assert "missing meal (rows 7)" in message
+    assert "invalid date (rows 8)" in message
+    Life_final.get_store("food").flush()
+    assert logged()[["item", "quantity", "calories"]].values.tolist() == [["rice", 2, 260]]
+
+
+def test_many_rejections_are_truncated():
+    message = log_meals([{"item": "rice", "quantity": -1, "meal": "lunch"}] * 7)
+    assert "invalid quantity (rows 1, 2, 3, 4, 5…)" in message and "✅ 0 meal item(s)" in message
+
+
+def test_aliases_default_meal_and_typos():
+    message = log_meals(pd.DataFrame({"Food": ["Chiken Curry", "banana"], "qty": [1, 2], "meal": [None, "snack"]}), meal_type="Dinner")
+    assert message == "✅ 2 meal item(s) logged (360 kcal), 1 matched to the closest food name"
+    Life_final.get_store("food").flush()
+    assert logged()[["meal", "item"]].values.tolist() == [["dinner", "chicken curry"], ["snack", "banana"]]
+
+
+def test_batch_without_items():
+    assert log_meals([{"quantity": 1}]).startswith("⚠️ No meals to log")
+    assert log_meals([]).startswith("⚠️ No meals to log")
+
+
+def test_single_meal_quantity_bounds():
+    assert log_meal("lunch", "rice", 1001) == "⚠️ Quantity must be between 1 and 1000."
+    assert log_meal("lunch", "rice", "lots") == "⚠️ Invalid quantity. Please enter a number."
+    assert log_meal("lunch", "rice", 1000).startswith("✅ 1000x rice logged")
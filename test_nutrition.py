@@ -0,0 +1,54 @@
+import pytest
+from nutrition import BUILTIN_FOODS, FoodDatabase, load_food_db
+
+# 🥗 Food lookup: exact names, prefixes and typos all find the right item
+
+
+@pytest.fixture
+def db():
+    return FoodDatabase({**BUILTIN_FOODS, "brown rice": {"cal": 112, "cat": "carb"}, "rice pudding": {"cal": 130, "cat": "sweet"},
+                         "chicken biryani": {"cal": 290, "cat": "carb"}})
+
+
+def test_match_exact_and_normalized(db):
+    assert db.match("rice") == "rice"
+    assert db.match("  Chicken   CURRY ") == "chicken curry"
+
+
+def test_match_typos_and_plurals(db):
+    assert db.match("chiken curry") == "chicken curry"
+    assert db.match("bananas") == "banana"
+    assert db.match("biryni chicken") == "chicken biryani"
+
+
+def test_match_gives_up_on_unknown_or_short_names(db):
+    assert db.match("xylophone") is None
+    assert db.match("ri") is None
+
+
+def test_search_puts_exact_then_prefix_matches_first(db):
+    names = [name for name, _ in db.search("rice")]
+    assert names[:3] == ["rice", "rice pudding", "brown rice"]
+    assert dict(db.search("rice"))["rice"] == 1.0
+
+
+def test_search_by_word_prefix(db):
+    assert [name for name, _ in db.search("chick")][:2] == ["chicken curry", "chicken biryani"]
+    assert "brown rice" in dict(db.search("bro"))
+
+
+def test_search_tolerates_typos(db):
+    name, score = db.search("bananna")[0]
+    assert name == "banana" and 0.3 <= score < 0.9
+
+
+def test_search_limit_and_empty_query(db):
+    assert len(db.search("a", limit=3)) <= 3
+    assert [name for name, _ in db.search("", limit=2)] == sorted(db)[:2]
+
+
+def test_catalogue_entries_override_builtins(tmp_path):
+    path = tmp_path / "foods.csv"
+    path.write_text("name,calories,category\nRice,150,Carb\nquinoa,120,carb\n", encoding="utf-8")
+    db = load_food_db(str(path))
+    assert db["rice"]["cal"] == 150 and db.match("quinoaa") == "quinoa"
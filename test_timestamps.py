@@ -0,0 +1,51 @@
+from datetime import date
+from zoneinfo import ZoneInfo
+import pandas as pd
+import pytest
+import timestamps
+from timestamps import format_timestamps, is_date_only, parse_timestamps
+
+# 🕒 Timestamps from any zone or era land on the same local wall time
+
+
+@pytest.fixture(autouse=True)
+def kolkata(monkeypatch):
+    monkeypatch.setattr(timestamps, "LOCAL_TZ", ZoneInfo("Asia/Kolkata"))
+
+
+MIXED = ["2025-07-20T06:30:00+05:30", "2025-07-20T01:00:00+00:00", "2025-07-19T20:00:00-05:00", "2025-07-21T00:00:00+14:00"]
+
+
+@pytest.mark.parametrize("repeat", [1, 20])  # the per-value path for a few rows, the vectorised one for many
+def test_mixed_offsets_parse_to_local_wall_time(repeat):
+    parsed = parse_timestamps(pd.Series(MIXED * repeat))
+    assert parsed.dt.strftime("%Y-%m-%d %H:%M").tolist()[:4] == ["2025-07-20 06:30"] * 3 + ["2025-07-20 15:30"]
+
+
+def test_legacy_and_date_only_values():
+    values = pd.Series(["2025-07-20", "2025-07-20 14:05", "2025-07-20 01:00", None, "2025-07-20T06:30:00+05:30"])
+    parsed = parse_timestamps(values, utc_mask=[False, False, True, False, False])
+    assert parsed.dt.strftime("%Y-%m-%d %H:%M").tolist()[:3] == ["2025-07-20 00:00", "2025-07-20 14:05", "2025-07-20 06:30"]
+    assert pd.isna(parsed.iloc[3])
+    assert parsed.iloc[4] == pd.Timestamp("2025-07-20 06:30")
+
+
+def test_format_writes_the_local_offset():
+    values = pd.Series(MIXED + ["2025-07-20", None])
+    assert format_timestamps(values).tolist() == ["2025-07-20T06:30:00+05:30"] * 3 + ["2025-07-20T15:30:00+05:30", "2025-07-20T00:00:00+05:30", None]
+
+
+def test_format_follows_daylight_saving(monkeypatch):
+    monkeypatch.setattr(timestamps, "LOCAL_TZ", ZoneInfo("America/New_York"))
+    values = pd.Series(["2025-01-15 12:00", "2025-07-15 12:00"])
+    assert format_timestamps(values).tolist() == ["2025-01-15T12:00:00-05:00", "2025-07-15T12:00:00-04:00"]
+
+
+def test_round_trip_is_stable():
+    once = format_timestamps(pd.Series(MIXED * 10))
+    assert format_timestamps(once).tolist() == once.tolist()
+
+
+def test_date_only_values():
+    assert is_date_only("2025-07-20") and is_date_only(date(2025, 7, 20))
+    assert not is_date_only("2025-07-20T00:00:00+05:30") and not is_date_only(pd.Timestamp("2025-07-20"))
@@ -0,0 +1,108 @@
+import os
+from datetime import datetime, date, time, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import numpy as np
+import pandas as pd
+
+# 🕒 One on-disk timestamp format for every log: ISO-8601 with the UTC offset,
+# e.g. "2025-07-20T06:30:00+05:30" (day-only entries are local midnight).
+# Readers parse it with a fixed format and convert to local wall time, so days
+# line up across logs even for rows written in another zone or taken from
+# Google Fit (UTC). Rows that predate the format still load through a slower
+# mixed-format fallback until migrate_timestamps.py rewrites them.
+
+def local_zone():
+    # LIFESYNC_TZ / TZ (IANA name) win, then the system zone, then a fixed offset
+    name = os.environ.get("LIFESYNC_TZ") or os.environ.get("TZ", "").lstrip(":")
+    if not name and os.path.islink("/etc/localtime"):
+        name = os.path.realpath("/etc/localtime").partition("zoneinfo/")[2]
+    if name:
+        try:
+            return ZoneInfo(name)
+        except (ValueError, ZoneInfoNotFoundError):
+            pass
+    return datetime.now().astimezone().tzinfo
+
+
+LOCAL_TZ = local_zone()
+
+
+def is_canonical(value):
+    return isinstance(value, str) and len(value) == 25 and value[10] == "T" and value[19] in "+-"
+
+
+def is_date_only(value):
+    # "2025-07-21" or a date: a calendar day, as written, with no time of day
+    if isinstance(value, str):
+        return ":" not in value
+    return isinstance(value, date) and not isinstance(value, datetime)
+
+
+def to_timestamp(value, assume_utc=False):
+    # Single value -> canonical string; naive values are local time unless assume_utc
+    if is_canonical(value) or value is None or (not isinstance(value, (str, date)) and pd.isna(value)):
+        return value
+    if isinstance(value, str):
+        value = pd.Timestamp(value).to_pydatetime()
+    elif not isinstance(value, datetime):
+        value = datetime.combine(value, time())
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc if assume_utc else LOCAL_TZ)
+    return value.astimezone(LOCAL_TZ).isoformat(timespec="seconds")
+
+
+def now_timestamp():
+    return datetime.now(LOCAL_TZ).replace(microsecond=0).isoformat()
+
+
+def offset_minutes(text):
+    # "+05:30" -> 330; anything else -> NaN
+    if not (isinstance(text, str) and len(text) == 6 and text[0] in "+-" and text[3] == ":" and (text[1:3] + text[4:]).isdigit()):
+        return np.nan
+    minutes = int(text[1:3]) * 60 + int(text[4:])
+    return -minutes if text[0] == "-" else minutes
+
+
+def parse_timestamps(values, utc_mask=None):
+    # -> naive local datetime64 Series. Canonical strings take the fixed-format
+    # fast path; legacy strings are wall times (local, or UTC where utc_mask is set)
+    if isinstance(values, pd.Series) and pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.tz_convert(LOCAL_TZ).dt.tz_localize(None) if values.dt.tz is not None else values
+    if 0 < len(values) <= 32:
+        # A few freshly appended rows: per-value parsing beats the vectorised setup
+        items = list(values)
+        if all(is_canonical(v) for v in items):
+            index = values.index if isinstance(values, pd.Series) else None
+            return pd.Series([datetime.fromisoformat(v).astimezone(LOCAL_TZ).replace(tzinfo=None) for v in items], index=index)
+    values = pd.Series(values, dtype=object) if not isinstance(values, pd.Series) else values
+    text = values.astype("string")
+    # Wall time and offset are parsed separately: a fixed-format parse without %z
+    # is several times faster, and a log only ever holds a handful of offsets
+    wall = pd.to_datetime(text.str[:19], format="%Y-%m-%dT%H:%M:%S", errors="coerce")
+    codes, offsets = pd.factorize(text.str[19:])
+    minutes = np.array([offset_minutes(o) for o in offsets] + [np.nan])
+    utc = wall - pd.to_timedelta(minutes[codes], unit="min")
+    parsed = utc.dt.tz_localize("UTC").dt.tz_convert(LOCAL_TZ).dt.tz_localize(None)
+    legacy = (parsed.isna() & values.notna()).to_numpy()
+    if legacy.any():
+        wall = pd.to_datetime(values[legacy].astype(str), format="mixed", errors="coerce")
+        from_utc = np.asarray(utc_mask, dtype=bool)[legacy] if utc_mask is not None else None
+        if from_utc is not None and from_utc.any():
+            wall[from_utc] = wall[from_utc].dt.tz_localize("UTC").dt.tz_convert(LOCAL_TZ).dt.tz_localize(None)
+        parsed[legacy] = wall
+    return parsed
+
+
+def format_timestamps(values):
+    # Naive local datetimes (or anything parse_timestamps accepts) -> canonical strings
+    wall = parse_timestamps(values)
+    if wall.empty:
+        return pd.Series([], index=wall.index, dtype=object)
+    aware = wall.dt.tz_localize(LOCAL_TZ, ambiguous=np.zeros(len(wall), dtype=bool), nonexistent="shift_forward")
+    wall = aware.dt.tz_localize(None)
+    utc = aware.dt.tz_convert("UTC").dt.tz_localize(None)
+    minutes = ((wall - utc) // pd.Timedelta(minutes=1)).fillna(0).astype(int).to_numpy()
+    offsets, which = np.unique(minutes, return_inverse=True)
+    suffixes = np.array([f"{'-' if m < 0 else '+'}{abs(m) // 60:02d}:{abs(m) % 60:02d}" for m in offsets], dtype=object)
+    text = np.datetime_as_string(wall.to_numpy(dtype="datetime64[s]"), unit="s").astype(object) + suffixes[which]
+    return pd.Series(np.where(wall.isna().to_numpy(), None, text), index=wall.index, dtype=object)